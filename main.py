@@ -1,10 +1,8 @@
-import asyncio
-
-from mcp_server_code_execution_mode import main as run_bridge
+from mcp_server_code_execution_mode import run as run_bridge
 
 
 def main() -> None:
-    asyncio.run(run_bridge())
+    run_bridge()
 
 
 if __name__ == "__main__":
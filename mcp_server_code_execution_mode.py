@@ -4,7 +4,7 @@
 from __future__ import annotations
 
 import asyncio
-import copy
+import codecs
 import json
 import keyword
 import logging
@@ -22,10 +22,14 @@ import inspect
 import io
 import tempfile
 import textwrap
+import time
 from asyncio import subprocess as aio_subprocess
+from collections import deque
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import (
     Any,
     Awaitable,
@@ -33,6 +37,7 @@ from typing import (
     Dict,
     List,
     Literal,
+    Mapping,
     NamedTuple,
     Optional,
     Protocol,
@@ -53,6 +58,20 @@ try:  # Prefer the official encoder when available
 except ImportError:  # pragma: no cover - fallback for environments without toon
     _toon_encode = None
 
+_orjson: Optional[Any] = None
+try:  # Faster JSON serialisation when the optional dependency is installed
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    _orjson = None
+
+_uvloop: Optional[Any] = None
+try:  # Faster event loop for the bridge's pipe-heavy I/O when installed
+    import uvloop
+
+    _uvloop = uvloop
+except ImportError:  # pragma: no cover - default asyncio loop
+    _uvloop = None
+
 
 def _check_pydantic_compatibility() -> None:
     """Check and warn/abort early for Pydantic/typing incompatibilities.
@@ -121,8 +140,10 @@ from mcp.types import (  # noqa: E402
     CallToolResult,
     ErrorData,
     Resource,
+    ServerNotification,
     TextContent,
     Tool,
+    ToolListChangedNotification,
 )
 
 logger = logging.getLogger("mcp-server-code-execution-mode")
@@ -133,12 +154,26 @@ DEFAULT_RUNTIME = os.environ.get("MCP_BRIDGE_RUNTIME")
 DEFAULT_TIMEOUT = int(os.environ.get("MCP_BRIDGE_TIMEOUT", "30"))
 MAX_TIMEOUT = int(os.environ.get("MCP_BRIDGE_MAX_TIMEOUT", "120"))
 DEFAULT_MEMORY = os.environ.get("MCP_BRIDGE_MEMORY", "512m")
+DEFAULT_TMPFS_TMP = os.environ.get("MCP_BRIDGE_TMPFS_TMP", "64m")
+DEFAULT_TMPFS_WORKSPACE = os.environ.get("MCP_BRIDGE_TMPFS_WORKSPACE", "128m")
 DEFAULT_PIDS = int(os.environ.get("MCP_BRIDGE_PIDS", "128"))
 DEFAULT_CPUS = os.environ.get("MCP_BRIDGE_CPUS")
 CONTAINER_USER = os.environ.get("MCP_BRIDGE_CONTAINER_USER", "65534:65534")
 DEFAULT_RUNTIME_IDLE_TIMEOUT = int(
     os.environ.get("MCP_BRIDGE_RUNTIME_IDLE_TIMEOUT", "300")
 )
+DEFAULT_WARM_POOL_SIZE = int(os.environ.get("MCP_BRIDGE_WARM_POOL", "0"))
+DEFAULT_MAX_OUTPUT_CHARS = int(
+    os.environ.get("MCP_BRIDGE_MAX_OUTPUT", str(8 * 1024 * 1024))
+)
+_MAX_CONCURRENT_RPCS = 16
+# Seconds a successful runtime check is trusted before it is repeated.
+_RUNTIME_READY_TTL = 30.0
+# docker/podman ``run`` exit status when the runtime, not the payload, failed.
+_RUNTIME_FAILURE_EXIT_CODE = 125
+_RPC_REPLY_OK = b'{"type":"rpc_response","id":%b,"success":true,"payload":%b}\n'
+# Per-line buffer limit for sandbox stdout; large prints arrive as one message.
+_STREAM_LIMIT = 16 * 1024 * 1024
 _ALLOW_SELF_SERVER = os.environ.get(
     "MCP_BRIDGE_ALLOW_SELF_SERVER", "0"
 ).strip().lower() in {
@@ -162,6 +197,10 @@ _PODMAN_PULL_PREFIXES: tuple[str, ...] = (
     "Writing manifest",
     "Storing signatures",
 )
+# Matches a line whose stripped text starts with any pull prefix.
+_PODMAN_PULL_RE = re.compile(
+    r"\s*(?:" + "|".join(map(re.escape, _PODMAN_PULL_PREFIXES)) + ")"
+)
 
 SANDBOX_HELPERS_SUMMARY = (
     "Python Sandbox. "
@@ -174,6 +213,10 @@ SANDBOX_HELPERS_SUMMARY = (
 
 _NOISE_STREAM_TOKENS = {"()"}
 
+_IDENT_RE = re.compile(r"[^0-9a-zA-Z_]+")
+# Server aliases are built from lowercased names, so no uppercase class needed
+_ALIAS_RE = re.compile(r"[^a-z0-9_]+")
+
 CAPABILITY_RESOURCE_URI = "resource://mcp-server-code-execution-mode/capabilities"
 _CAPABILITY_RESOURCE_NAME = "code-execution-capabilities"
 _CAPABILITY_RESOURCE_TITLE = "Code Execution Sandbox Helpers"
@@ -338,6 +381,27 @@ ConfigSource(
 """
 
 
+def _existing_source_paths(sources: Sequence[ConfigSource]) -> set[Path]:
+    """Return the source paths that exist, listing each parent directory once."""
+
+    by_parent: Dict[Path, List[Path]] = {}
+    for source in sources:
+        by_parent.setdefault(source.path.parent, []).append(source.path)
+
+    existing: set[Path] = set()
+    for parent, paths in by_parent.items():
+        try:
+            with os.scandir(parent) as entries:
+                names = {entry.name for entry in entries}
+        except FileNotFoundError:
+            continue
+        except Exception:
+            existing.update(path for path in paths if path.exists())
+            continue
+        existing.update(path for path in paths if path.name in names)
+    return existing
+
+
 class SandboxError(RuntimeError):
     """Raised when the sandbox cannot execute user code."""
 
@@ -378,6 +442,87 @@ class SandboxTimeout(SandboxError):
     """Raised when user code exceeds the configured timeout."""
 
 
+class _ArgumentValidationError(ValueError):
+    """Raised when ``run_python`` arguments fail validation."""
+
+
+# Bootstrap run by pre-started containers: block until the host sends a
+# length-prefixed JSON frame carrying the rendered entrypoint, then execute it.
+# Reads go straight to fd 0 so no bytes are buffered away from the entrypoint's
+# own stdin RPC reader.
+_WARM_CONTAINER_BOOTSTRAP = textwrap.dedent(
+    """
+    import json, os, sys
+    header = b""
+    while not header.endswith(b"\\n"):
+        chunk = os.read(0, 1)
+        if not chunk:
+            sys.exit(0)
+        header += chunk
+    remaining = int(header)
+    parts = []
+    while remaining:
+        chunk = os.read(0, remaining)
+        if not chunk:
+            sys.exit(0)
+        parts.append(chunk)
+        remaining -= len(chunk)
+    frame = json.loads(b"".join(parts))
+    os.environ.update(frame.get("env") or {})
+    code = compile(frame["source"], "/ipc/entrypoint.py", "exec")
+    exec(code, {"__name__": "__main__"})
+    """
+).strip()
+
+
+@dataclass
+class _WarmContainer:
+    """A pre-started container waiting for its entrypoint frame."""
+
+    process: aio_subprocess.Process
+    started_at: float
+
+
+class _BoundedTextBuffer:
+    """Accumulate stream text, keeping only the most recent ``limit`` characters.
+
+    A non-positive ``limit`` disables the cap.
+    """
+
+    __slots__ = ("_chunks", "_dropped", "_limit", "_size")
+
+    def __init__(self, limit: int = DEFAULT_MAX_OUTPUT_CHARS) -> None:
+        self._chunks: deque[str] = deque()
+        self._limit = limit
+        self._size = 0
+        self._dropped = 0
+
+    def append(self, text: str) -> None:
+        if not text:
+            return
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._limit <= 0:
+            return
+        while self._size > self._limit:
+            excess = self._size - self._limit
+            head = self._chunks[0]
+            if len(head) <= excess:
+                self._chunks.popleft()
+                trimmed = len(head)
+            else:
+                self._chunks[0] = head[excess:]
+                trimmed = excess
+            self._size -= trimmed
+            self._dropped += trimmed
+
+    def getvalue(self) -> str:
+        body = "".join(self._chunks)
+        if self._dropped:
+            return f"...[truncated {self._dropped} characters]...\n{body}"
+        return body
+
+
 @dataclass
 class SandboxResult:
     """Execution result captured from the sandbox."""
@@ -398,6 +543,13 @@ class MCPServerInfo:
     env: Dict[str, str]
     cwd: Optional[str] = None
     description: str = ""
+    # Normalised forms of ``cwd``, derived once at construction
+    cwd_str: Optional[str] = field(init=False, repr=False, compare=False)
+    cwd_path: Optional[Path] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.cwd_str = str(self.cwd) if self.cwd else None
+        self.cwd_path = Path(self.cwd) if self.cwd else None
 
 
 def _looks_like_self_server(
@@ -436,30 +588,212 @@ def _looks_like_self_server(
     return False
 
 
+def _json_default(value: object) -> object:
+    """Serialise read-only mappings (frozen metadata) as plain objects."""
+
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps_compact_bytes(value: object) -> bytes:
+    """Serialise ``value`` as compact UTF-8 encoded JSON."""
+
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(value, default=_json_default)
+        except TypeError:  # pragma: no cover - e.g. integers beyond 64 bits
+            pass
+    return json.dumps(
+        value, separators=(",", ":"), ensure_ascii=False, default=_json_default
+    ).encode("utf-8")
+
+
+def _dumps_compact(value: object) -> str:
+    """Serialise ``value`` as compact JSON without ASCII-escaping unicode."""
+
+    return _dumps_compact_bytes(value).decode("utf-8")
+
+
+def _write_file_bytes(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` with raw ``os`` calls, truncating it first."""
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _freeze_jsonish(value: Any) -> Any:
+    """Return a read-only copy of JSON-shaped data.
+
+    Dicts become ``MappingProxyType`` views and lists become tuples, so cached
+    structures can be handed out without defensive copies.
+    """
+
+    value_type = type(value)
+    if value_type is dict:
+        return MappingProxyType(
+            {key: _freeze_jsonish(item) for key, item in value.items()}
+        )
+    if value_type is list or value_type is tuple:
+        return tuple(_freeze_jsonish(item) for item in value)
+    return value
+
+
+# orjson turns integers outside the 64-bit range into floats; any run of 19+
+# digits may be one, so such documents go through the exact stdlib parser.
+_LONG_DIGITS_RE = re.compile(rb"\d{19}")
+
+
+def _loads_json(data: bytes) -> object:
+    """Parse a JSON document from raw bytes, keeping large integers exact."""
+
+    if _orjson is not None and _LONG_DIGITS_RE.search(data) is None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_pretty(value: object) -> str:
+    """Serialise ``value`` as indented JSON with sorted keys."""
+
+    if _orjson is not None:
+        try:
+            option = _orjson.OPT_INDENT_2 | _orjson.OPT_SORT_KEYS
+            return _orjson.dumps(
+                value, option=option, default=_json_default
+            ).decode("utf-8")
+        except TypeError:  # pragma: no cover - e.g. integers beyond 64 bits
+            pass
+    return json.dumps(
+        value, indent=2, sort_keys=True, ensure_ascii=False, default=_json_default
+    )
+
+
 def _split_output_lines(stream: Optional[str]) -> List[str]:
-    """Return a newline-preserving list for stdout/stderr fields."""
+    """Split a stdout/stderr field into lines, dropping whitespace/noise-only ones.
+
+    Splitting and filtering happen in one pass so large outputs do not
+    materialise an intermediate list before the noise filter runs.
+    """
 
     if not stream:
         return []
-    return stream.splitlines()
+    noise = _NOISE_STREAM_TOKENS
+    return [
+        line
+        for line in stream.splitlines()
+        if (stripped := line.strip()) and stripped not in noise
+    ]
 
 
-def _filter_stream_lines(lines: Sequence[str]) -> List[str]:
-    """Drop whitespace-only or noise-only lines to save response tokens."""
+# Word boundaries used to pre-tokenise search keywords (``list_things`` -> list, things)
+_KEYWORD_SPLIT_RE = re.compile(r"[\s_\-./:]+")
 
-    filtered: List[str] = []
-    for line in lines:
-        text = str(line)
-        stripped = text.strip()
-        if not stripped or stripped in _NOISE_STREAM_TOKENS:
-            continue
-        filtered.append(text)
-    return filtered
+
+@dataclass(slots=True)
+class _SearchEntry:
+    """One tool in the bridge's search index."""
+
+    server: str
+    server_alias: str
+    info: Dict[str, object]
+    haystack: str
+    tokens: frozenset[str]
+
+
+def _trigrams(text: str) -> set[str]:
+    """Return every three-character substring of ``text``."""
+
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass(slots=True)
+class _SearchShard:
+    """Search entries of one server plus trigram postings over them."""
+
+    entries: List[_SearchEntry]
+    # Trigram -> positions in ``entries`` whose haystack contains it
+    postings: Dict[str, set[int]]
+
+    @classmethod
+    def build(
+        cls,
+        server_name: str,
+        server_alias: str,
+        doc_entries: Sequence[Dict[str, object]],
+    ) -> "_SearchShard":
+        entries: List[_SearchEntry] = []
+        postings: Dict[str, set[int]] = {}
+        for info in doc_entries:
+            # ``keywords`` is already lowercased when the docs cache is built
+            haystack = cast(str, info["keywords"])
+            for trigram in _trigrams(haystack):
+                postings.setdefault(trigram, set()).add(len(entries))
+            entries.append(
+                _SearchEntry(
+                    server_name,
+                    server_alias,
+                    info,
+                    haystack,
+                    cast(frozenset[str], info["keyword_tokens"]),
+                )
+            )
+        return cls(entries, postings)
+
+    def candidates(self, trigrams: frozenset[str]) -> Sequence[int]:
+        """Return entry positions that may contain every query trigram, in order.
+
+        A substring match implies that each of the token's trigrams occurs in
+        the haystack, so intersecting trigram postings prunes the scan. Any
+        unseen trigram rules the shard out before a single posting is read;
+        an empty set (tokens under three characters) cannot prune.
+        """
+
+        if not trigrams:
+            return range(len(self.entries))
+        postings = self.postings
+        lists: List[set[int]] = []
+        for trigram in trigrams:
+            posting = postings.get(trigram)
+            if posting is None:
+                return ()
+            lists.append(posting)
+        # The rarest posting drives the intersection
+        lists.sort(key=len)
+        return sorted(lists[0].intersection(*lists[1:]))
 
 
 def _render_toon_block(payload: Dict[str, object]) -> str:
     """Encode a payload in TOON format, falling back to JSON when unavailable."""
 
+    # Stream-free payloads (status, summary, exit code, ...) repeat constantly
+    # and are small, so their rendering is memoised; outputs are not.
+    if "stdout" not in payload and "stderr" not in payload:
+        try:
+            key = tuple(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in payload.items()
+            )
+            return _render_toon_block_cached(key)
+        except TypeError:  # unhashable field values
+            pass
+    return _render_toon_block_uncached(payload)
+
+
+@lru_cache(maxsize=256)
+def _render_toon_block_cached(key: Tuple[Tuple[str, object], ...]) -> str:
+    payload = {
+        name: list(value) if isinstance(value, tuple) else value
+        for name, value in key
+    }
+    return _render_toon_block_uncached(payload)
+
+
+def _render_toon_block_uncached(payload: Dict[str, object]) -> str:
     if _toon_encode is not None:
         try:
             body = _toon_encode(payload)
@@ -469,7 +803,7 @@ def _render_toon_block(payload: Dict[str, object]) -> str:
             body = body.rstrip()
             return f"```toon\n{body}\n```" if body else "```toon\n```"
 
-    fallback = json.dumps(payload, indent=2, sort_keys=True)
+    fallback = _dumps_pretty(payload)
     return f"```json\n{fallback}\n```"
 
 
@@ -479,6 +813,13 @@ def _output_mode() -> str:
     return os.environ.get("MCP_BRIDGE_OUTPUT_MODE", "compact").strip().lower()
 
 
+def _skip_text_for_structured() -> bool:
+    """Return True when responses should rely on structuredContent alone."""
+
+    value = os.environ.get("MCP_BRIDGE_SKIP_TEXT_FOR_STRUCTURED", "0")
+    return value.strip().lower() in {"1", "true", "yes"}
+
+
 def _render_compact_output(payload: Dict[str, object]) -> str:
     """Render a terse, token-efficient textual summary."""
 
@@ -574,22 +915,24 @@ def _build_response_payload(
 ) -> Dict[str, object]:
     """Create a structured payload shared by compact/TOON responses."""
 
-    summary_lower = summary.strip().lower()
-    payload: Dict[str, object] = {
-        "status": status,
-        "summary": summary,
-    }
+    # Every field is gated as it is written so empty values never land in
+    # the payload and no final filtering pass is needed.
+    payload: Dict[str, object] = {}
+    if status:
+        payload["status"] = status
+    if summary:
+        payload["summary"] = summary
 
     if exit_code is not None:
         payload["exitCode"] = exit_code
     if servers:
         payload["servers"] = list(servers)
 
-    stdout_lines = _filter_stream_lines(_split_output_lines(stdout))
+    stdout_lines = _split_output_lines(stdout)
     if stdout_lines:
         payload["stdout"] = stdout_lines
 
-    stderr_lines = _filter_stream_lines(_split_output_lines(stderr))
+    stderr_lines = _split_output_lines(stderr)
     if stderr_lines:
         payload["stderr"] = stderr_lines
 
@@ -599,24 +942,14 @@ def _build_response_payload(
         payload["timeoutSeconds"] = timeout_seconds
 
     if (
-        status.lower() == "success"
-        and not payload.get("stdout")
-        and not payload.get("stderr")
-        and summary_lower == "success"
+        not stdout_lines
+        and not stderr_lines
+        and status.lower() == "success"
+        and summary.strip().lower() == "success"
     ):
         payload["summary"] = "Success (no output)"
 
-    return {key: value for key, value in payload.items() if not _is_empty_field(value)}
-
-
-def _is_empty_field(value: object) -> bool:
-    """Return True when a structured field should be omitted."""
-
-    if value is None:
-        return True
-    if isinstance(value, (list, tuple, set, dict, str)):
-        return len(value) == 0
-    return False
+    return payload
 
 
 def _build_tool_response(
@@ -644,6 +977,16 @@ def _build_tool_response(
     )
     status = str(payload.get("status", "error")).lower()
     is_error = status not in {"success"}
+
+    if _skip_text_for_structured():
+        # Clients reading structuredContent never look at the text block, so
+        # skip rendering it and ship the full payload as the source of truth.
+        return CallToolResult(
+            content=[TextContent(type="text", text="")],
+            structuredContent=payload,
+            isError=is_error,
+        )
+
     mode = _output_mode()
 
     if mode == "compact":
@@ -663,11 +1006,11 @@ def _build_tool_response(
     )
 
 
+@lru_cache(maxsize=512)
 def _sanitize_identifier(value: str, *, default: str) -> str:
     """Convert an arbitrary string into a valid Python identifier."""
 
-    cleaned = re.sub(r"[^0-9a-zA-Z_]+", "_", value.strip())
-    cleaned = cleaned.lower() or default
+    cleaned = _IDENT_RE.sub("_", value.strip()).lower() or default
     if cleaned[0].isdigit():
         cleaned = f"_{cleaned}"
     if keyword.iskeyword(cleaned):
@@ -675,6 +1018,25 @@ def _sanitize_identifier(value: str, *, default: str) -> str:
     return cleaned
 
 
+def _warn_if_cwd_missing(server_name: str, cwd: Path) -> None:
+    """Log a warning when a server's configured cwd does not exist."""
+
+    try:
+        if not cwd.exists():
+            logger.warning(
+                "Configured cwd for MCP server %s does not exist: %s",
+                server_name,
+                cwd,
+            )
+    except Exception:
+        logger.debug(
+            "Failed to check cwd for server %s: %s",
+            server_name,
+            cwd,
+            exc_info=True,
+        )
+
+
 class PersistentMCPClient:
     """Maintain a persistent MCP stdio session."""
 
@@ -684,11 +1046,62 @@ class PersistentMCPClient:
         self._session: Optional[ClientSession] = None
         self._forward_task: Optional[asyncio.Task[None]] = None
         self._captured_stderr: Optional[io.TextIOBase] = None
+        self._tools_cache: Optional[List[Dict[str, object]]] = None
+        self._lifecycle_task: Optional[asyncio.Task[None]] = None
+        self._stop_requested = asyncio.Event()
 
     async def start(self) -> None:
-        if self._session:
+        if self._session or self._lifecycle_task:
+            return
+
+        # anyio cancel scopes inside stdio_client/ClientSession must be exited
+        # by the task that entered them, and load_server and shutdown run in
+        # different tasks; a dedicated task owns the session from open to close.
+        ready: asyncio.Future[object] = asyncio.get_running_loop().create_future()
+        self._stop_requested = asyncio.Event()
+        task = asyncio.create_task(self._run_session(ready))
+        self._lifecycle_task = task
+        try:
+            init_result = await ready
+        except BaseException:
+            self._lifecycle_task = None
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+            raise
+
+        # Servers that advertise tools get their list fetched while the loads
+        # of other servers are still in flight, so the first metadata request
+        # is answered from the cache instead of paying a round-trip.
+        capabilities = getattr(init_result, "capabilities", None)
+        if getattr(capabilities, "tools", None) is not None:
+            try:
+                await self.list_tools()
+            except Exception:
+                logger.debug(
+                    "Eager list_tools failed for %s",
+                    self.server_info.name,
+                    exc_info=True,
+                )
+
+    async def _run_session(self, ready: asyncio.Future[object]) -> None:
+        try:
+            init_result = await self._open_session()
+        except asyncio.CancelledError:
+            ready.cancel()
+            await self._close_session()
+            raise
+        except BaseException as exc:
+            await self._close_session()
+            ready.set_exception(exc)
             return
+        ready.set_result(init_result)
+        try:
+            await self._stop_requested.wait()
+        finally:
+            await self._close_session()
 
+    async def _open_session(self) -> object:
         params = StdioServerParameters(
             command=self.server_info.command,
             args=self.server_info.args,
@@ -703,8 +1116,8 @@ class PersistentMCPClient:
             client_cm = stdio_client(params, errlog=self._captured_stderr)
         else:
             client_cm = stdio_client(params)
-        self._stdio_cm = client_cm
         raw_read_stream, write_stream = await client_cm.__aenter__()
+        self._stdio_cm = client_cm
 
         # Create a filtered reader stream to hide benign XML/blank-line JSON parse errors
         filtered_writer, filtered_read = anyio.create_memory_object_stream(0)
@@ -730,10 +1143,14 @@ class PersistentMCPClient:
         # Launch the forwarder task
         self._forward_task = asyncio.create_task(_forward_read())
 
-        session = ClientSession(filtered_read, write_stream)
+        session = ClientSession(
+            filtered_read, write_stream, message_handler=self._handle_message
+        )
         await session.__aenter__()
+        # Tracked before the handshake so _close_session exits it on failure
+        self._session = session
         try:
-            await session.initialize()
+            init_result = await session.initialize()
         except Exception as exc:  # pragma: no cover - initialization failure reporting
             # Read captured stderr content for diagnostics if present
             stderr_text = ""
@@ -748,16 +1165,28 @@ class PersistentMCPClient:
             )
             # Re-raise for callers to handle; captured stderr is useful for debugging
             raise
-        self._session = session
+        return init_result
 
     async def list_tools(self) -> List[Dict[str, object]]:
         if not self._session:
             raise SandboxError("MCP client not started")
 
-        result = await self._session.list_tools()
-        return [
-            tool.model_dump(by_alias=True, exclude_none=True) for tool in result.tools
-        ]
+        if self._tools_cache is None:
+            result = await self._session.list_tools()
+            self._tools_cache = [
+                tool.model_dump(by_alias=True, exclude_none=True)
+                for tool in result.tools
+            ]
+        return list(self._tools_cache)
+
+    async def _handle_message(self, message: object) -> None:
+        """Drop the cached tool list when the server says it changed."""
+
+        if isinstance(message, ServerNotification) and isinstance(
+            message.root, ToolListChangedNotification
+        ):
+            self._tools_cache = None
+        await anyio.lowlevel.checkpoint()
 
     async def call_tool(
         self, name: str, arguments: Dict[str, object]
@@ -769,18 +1198,37 @@ class PersistentMCPClient:
         return call_result.model_dump(by_alias=True, exclude_none=True)
 
     async def stop(self) -> None:
+        task = self._lifecycle_task
+        if task is None:
+            return
+        self._lifecycle_task = None
+        self._stop_requested.set()
+        await task
+
+    async def _close_session(self) -> None:
         if self._session:
             try:
                 await self._session.__aexit__(None, None, None)
             except* Exception as exc:  # pragma: no cover - defensive cleanup
-                logger.debug("MCP session shutdown raised %s", exc, exc_info=True)
+                logger.warning(
+                    "MCP session shutdown for %s raised %s",
+                    self.server_info.name,
+                    exc,
+                    exc_info=True,
+                )
             finally:
                 self._session = None
+                self._tools_cache = None
         if self._stdio_cm:
             try:
                 await self._stdio_cm.__aexit__(None, None, None)  # type: ignore[union-attr]
             except* Exception as exc:  # pragma: no cover - defensive cleanup
-                logger.debug("MCP stdio shutdown raised %s", exc, exc_info=True)
+                logger.warning(
+                    "MCP stdio shutdown for %s raised %s",
+                    self.server_info.name,
+                    exc,
+                    exc_info=True,
+                )
             finally:
                 self._stdio_cm = None
         # Ensure the forwarder task is cancelled
@@ -798,6 +1246,628 @@ class PersistentMCPClient:
             self._captured_stderr = None
 
 
+# Sandbox entrypoint source; the ``__*__`` placeholders are substituted per run.
+_ENTRYPOINT_TEMPLATE = textwrap.dedent(
+    """
+    import ast
+    import asyncio
+    import functools
+    import inspect
+    import json
+    import os
+    import sys
+    import threading
+    import traceback
+    import types
+    from contextlib import suppress
+    from pathlib import Path
+
+    AVAILABLE_SERVERS = json.loads(__METADATA_JSON__)
+    DISCOVERED_SERVERS = json.loads(__DISCOVERED_JSON__)
+    CODE = __CODE_LITERAL__
+    USER_TOOLS_PATH = Path("/projects/user_tools.py")
+
+    _PENDING_RESPONSES = {}
+    _REQUEST_COUNTER = 0
+    _READER_TASK = None
+
+    _OUT = sys.__stdout__
+    _OUT_BUFFER = getattr(_OUT, "buffer", None)
+    _OUT_LOCK = threading.Lock()
+
+    def _send_message(message):
+        data = json.dumps(message, separators=(",", ":")) + "\\n"
+        with _OUT_LOCK:
+            if _OUT_BUFFER is not None:
+                _OUT_BUFFER.write(data.encode("utf-8"))
+                _OUT_BUFFER.flush()
+            else:
+                _OUT.write(data)
+                _OUT.flush()
+
+    _STREAM_FLUSH_CHARS = 4096
+    _STREAM_FLUSH_DELAY = 0.05
+
+    class _StreamProxy:
+        # Line-buffered so print()'s separate text/newline writes share a frame;
+        # partial lines go out once they grow large or sit for a short delay so
+        # output written before a timeout or kill still reaches the host.
+        def __init__(self, kind):
+            self._kind = kind
+            self._pending = []
+            self._pending_len = 0
+            self._lock = threading.Lock()
+            self._timer = None
+
+        def write(self, data):
+            if not data:
+                return 0
+            with self._lock:
+                rest = data
+                if "\\n" in rest:
+                    head, sep, rest = rest.rpartition("\\n")
+                    self._pending.append(head + sep)
+                    self._flush_locked()
+                if rest:
+                    self._pending.append(rest)
+                    self._pending_len += len(rest)
+                    if self._pending_len >= _STREAM_FLUSH_CHARS:
+                        self._flush_locked()
+                    elif self._timer is None:
+                        self._timer = threading.Timer(_STREAM_FLUSH_DELAY, self.flush)
+                        self._timer.daemon = True
+                        self._timer.start()
+            return len(data)
+
+        def flush(self):
+            with self._lock:
+                self._flush_locked()
+
+        def _flush_locked(self):
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending:
+                chunk = "".join(self._pending)
+                self._pending = []
+                self._pending_len = 0
+                _send_message({"type": self._kind, "data": chunk})
+
+        def isatty(self):
+            return False
+
+    _STDOUT_PROXY = _StreamProxy("stdout")
+    _STDERR_PROXY = _StreamProxy("stderr")
+    sys.stdout = _STDOUT_PROXY
+    sys.stderr = _STDERR_PROXY
+
+    def _handle_response_line(line):
+        try:
+            message = json.loads(line)
+        except Exception:
+            return
+        if not isinstance(message, dict) or message.get("type") != "rpc_response":
+            return
+        request_id = message.get("id")
+        future = _PENDING_RESPONSES.pop(request_id, None)
+        if future and not future.done():
+            if message.get("success", True):
+                future.set_result(message.get("payload"))
+            else:
+                future.set_exception(RuntimeError(message.get("error", "RPC error")))
+
+    async def _stdin_reader():
+        # Parse responses straight off fd 0 from a loop reader callback rather
+        # than layering a StreamReader protocol over a pipe transport.
+        loop = asyncio.get_running_loop()
+        fd = sys.stdin.fileno()
+        buffer = bytearray()
+        closed = loop.create_future()
+
+        def _on_readable():
+            try:
+                chunk = os.read(fd, 65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                chunk = b""
+            if not chunk:
+                if not closed.done():
+                    closed.set_result(None)
+                return
+            buffer.extend(chunk)
+            while True:
+                newline = buffer.find(b"\\n")
+                if newline < 0:
+                    break
+                line = bytes(buffer[:newline])
+                del buffer[: newline + 1]
+                _handle_response_line(line)
+
+        loop.add_reader(fd, _on_readable)
+        try:
+            await closed
+        finally:
+            loop.remove_reader(fd)
+            for future in list(_PENDING_RESPONSES.values()):
+                if not future.done():
+                    future.set_exception(RuntimeError("RPC channel closed"))
+
+    async def _ensure_reader():
+        global _READER_TASK
+        if _READER_TASK is None:
+            _READER_TASK = asyncio.create_task(_stdin_reader())
+
+    async def _rpc_call(payload):
+        await _ensure_reader()
+        loop = asyncio.get_running_loop()
+        global _REQUEST_COUNTER
+        _REQUEST_COUNTER += 1
+        request_id = _REQUEST_COUNTER
+        future = loop.create_future()
+        _PENDING_RESPONSES[request_id] = future
+        _send_message({"type": "rpc_request", "id": request_id, "payload": payload})
+        return await future
+
+    def _install_mcp_modules():
+        mcp_pkg = types.ModuleType("mcp")
+        mcp_pkg.__path__ = []
+        mcp_pkg.__all__ = ["runtime", "servers"]
+        sys.modules["mcp"] = mcp_pkg
+
+        runtime_module = types.ModuleType("mcp.runtime")
+        servers_module = types.ModuleType("mcp.servers")
+        servers_module.__path__ = []
+        sys.modules["mcp.runtime"] = runtime_module
+        sys.modules["mcp.servers"] = servers_module
+        mcp_pkg.runtime = runtime_module
+        mcp_pkg.servers = servers_module
+
+        # Load user tools if they exist
+        if USER_TOOLS_PATH.exists():
+            try:
+                import importlib.util
+                spec = importlib.util.spec_from_file_location("user_tools", USER_TOOLS_PATH)
+                if spec and spec.loader:
+                    user_tools = importlib.util.module_from_spec(spec)
+                    sys.modules["user_tools"] = user_tools
+                    spec.loader.exec_module(user_tools)
+                    # Export everything from user_tools to global namespace
+                    for name, val in vars(user_tools).items():
+                        if not name.startswith("_"):
+                            globals()[name] = val
+            except Exception:
+                # We silently ignore errors during tool loading to not break startup
+                pass
+
+        def save_tool(func):
+            '''Saves a function as a persistent tool available in future sessions.'''
+            if not inspect.isfunction(func):
+                raise ValueError("save_tool expects a function")
+            
+            source = inspect.getsource(func)
+            # Ensure the file exists
+            USER_TOOLS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Append to file
+            with open(USER_TOOLS_PATH, "a") as f:
+                f.write("\\n\\n")
+                f.write(source)
+            
+            return f"Tool '{func.__name__}' saved. It will be available in future sessions."
+
+        # Expose save_tool to runtime
+        runtime_module.save_tool = save_tool
+        globals()["save_tool"] = save_tool
+
+        class MCPError(RuntimeError):
+            'Raised when an MCP call fails.'
+
+        _CAPABILITY_SUMMARY = (
+            "--- PYTHON SANDBOX MANUAL ---\\n"
+            "1. PHILOSOPHY: You are in a persistent Python environment. Prefer writing code over calling tools when possible.\\n"
+            "2. DISCOVERY: Use `runtime.discovered_servers()` to list servers. "
+            "Use `runtime.discovered_servers(detailed=True)` for descriptions. "
+            "Use `runtime.search_tool_docs('query')` to find tools. "
+            "Don't guess tool names; search first.\\n"
+            "3. PERSISTENCE: You can save your own tools! Define a Python function and call `save_tool(func)`. "
+            "It will be saved to `~/MCPs/user_tools.py` and auto-loaded in future sessions.\\n"
+            "4. HELPERS: `import mcp.runtime as runtime`. Available: list_servers(), list_tools_sync(server), "
+            "query_tool_docs(server), describe_server(name).\\n"
+            "5. PROXIES: Loaded servers are available as `mcp_<alias>` (e.g. `await mcp_filesystem.read_file(...)`)."
+        )
+
+        _LOADED_SERVER_NAMES = tuple(server.get("name") for server in AVAILABLE_SERVERS)
+
+        _SERVERS_BY_NAME = {server.get("name"): server for server in AVAILABLE_SERVERS}
+        _SEARCH_ENTRIES = []
+
+        def _lookup_server(name):
+            server = _SERVERS_BY_NAME.get(name)
+            if server is None:
+                raise MCPError(f"Server {name!r} is not loaded")
+            return server
+
+        def _search_entries():
+            # Lowercased haystacks are built once, on the first search
+            if not _SEARCH_ENTRIES:
+                for server_info in AVAILABLE_SERVERS:
+                    server_keywords = " ".join(
+                        filter(None, (server_info.get("name"), server_info.get("alias")))
+                    )
+                    for tool_info in server_info.get("tools", ()) or ():
+                        haystack = " ".join(
+                            filter(
+                                None,
+                                (
+                                    server_keywords,
+                                    tool_info.get("name"),
+                                    tool_info.get("alias"),
+                                    tool_info.get("description"),
+                                ),
+                            )
+                        ).lower()
+                        _SEARCH_ENTRIES.append((haystack, server_info, tool_info))
+            return _SEARCH_ENTRIES
+
+        def _normalise_detail(value):
+            detail = str(value).lower() if value is not None else "summary"
+            return detail if detail in {"summary", "full"} else "summary"
+
+        def _format_tool_doc(server_info, tool_info, detail):
+            doc = {
+                "server": server_info.get("name"),
+                "serverAlias": server_info.get("alias"),
+                "tool": tool_info.get("name"),
+                "toolAlias": tool_info.get("alias"),
+            }
+            description = tool_info.get("description")
+            if description:
+                doc["description"] = description
+            if detail == "full" and tool_info.get("input_schema") is not None:
+                doc["inputSchema"] = tool_info.get("input_schema")
+            return doc
+
+        async def call_tool(server, tool, arguments=None):
+            response = await _rpc_call(
+                {
+                    "type": "call_tool",
+                    "server": server,
+                    "tool": tool,
+                    "arguments": arguments or {},
+                }
+            )
+            if not response.get("success", True):
+                raise MCPError(response.get("error", "MCP request failed"))
+            return response.get("result")
+
+        async def batch_call(calls, *, max_concurrent=8, stop_on_error=False):
+            '''Run several tool calls in one RPC; results mirror the input order.'''
+            response = await _rpc_call(
+                {
+                    "type": "batch_call",
+                    "calls": [
+                        {
+                            "server": call.get("server"),
+                            "tool": call.get("tool"),
+                            "arguments": call.get("arguments") or {},
+                        }
+                        for call in calls
+                    ],
+                    "maxConcurrent": max_concurrent,
+                    "stopOnError": stop_on_error,
+                }
+            )
+            if not response.get("success", True):
+                raise MCPError(response.get("error", "MCP request failed"))
+            return response.get("results", [])
+
+        async def list_tools(server):
+            response = await _rpc_call(
+                {
+                    "type": "list_tools",
+                    "server": server,
+                }
+            )
+            if not response.get("success", True):
+                raise MCPError(response.get("error", "MCP request failed"))
+            return response.get("tools", [])
+
+        async def list_servers():
+            response = await _rpc_call({"type": "list_servers"})
+            if not response.get("success", True):
+                raise MCPError(response.get("error", "MCP request failed"))
+            return tuple(response.get("servers", ()))
+
+        def list_servers_sync():
+            return tuple(name for name in _LOADED_SERVER_NAMES if name)
+
+        def discovered_servers(detailed=False):
+            if detailed:
+                return tuple({"name": k, "description": v} for k, v in DISCOVERED_SERVERS.items())
+            return tuple(DISCOVERED_SERVERS.keys())
+
+        def describe_server(name):
+            return _lookup_server(name)
+
+        def list_loaded_server_metadata():
+            return tuple(AVAILABLE_SERVERS)
+
+        def list_tools_sync(server=None):
+            if server is None:
+                raise MCPError("list_tools_sync(server) requires a server name")
+            info = _lookup_server(server)
+            tools = info.get("tools", ()) or ()
+            return tuple(tools)
+
+        async def query_tool_docs(server, tool=None, detail="summary"):
+            payload = {"type": "query_tool_docs", "server": server}
+            if tool is not None:
+                payload["tool"] = tool
+            if detail is not None:
+                payload["detail"] = detail
+            response = await _rpc_call(payload)
+            if not response.get("success", True):
+                raise MCPError(response.get("error", "MCP request failed"))
+            docs = response.get("docs", [])
+            if tool is not None and isinstance(docs, list) and len(docs) == 1:
+                return docs[0]
+            return docs
+
+        async def search_tool_docs(query, *, limit=5, detail="summary"):
+            payload = {"type": "search_tool_docs", "query": query}
+            if limit is not None:
+                payload["limit"] = limit
+            if detail is not None:
+                payload["detail"] = detail
+            response = await _rpc_call(payload)
+            if not response.get("success", True):
+                raise MCPError(response.get("error", "MCP request failed"))
+            return response.get("results", [])
+
+        def query_tool_docs_sync(server, tool=None, detail="summary"):
+            info = _lookup_server(server)
+            detail_value = _normalise_detail(detail)
+            tools = info.get("tools", ()) or ()
+            if tool is None:
+                return [_format_tool_doc(info, tool_info, detail_value) for tool_info in tools]
+
+            if not isinstance(tool, str):
+                raise MCPError("'tool' must be a string when provided")
+            target = tool.lower()
+            for candidate in tools:
+                alias_value = str(candidate.get("alias", "")).lower()
+                name_value = str(candidate.get("name", "")).lower()
+                if target in {alias_value, name_value}:
+                    return [_format_tool_doc(info, candidate, detail_value)]
+            raise MCPError(f"Tool {tool!r} not found for server {server}")
+
+        def search_tool_docs_sync(query, *, limit=5, detail="summary"):
+            tokens = [token for token in str(query).lower().split() if token]
+            if not tokens:
+                return []
+            detail_value = _normalise_detail(detail)
+            try:
+                capped = max(1, min(20, int(limit)))
+            except Exception:
+                capped = 5
+            matches = []
+            for haystack, server_info, tool_info in _search_entries():
+                if all(token in haystack for token in tokens):
+                    matches.append(_format_tool_doc(server_info, tool_info, detail_value))
+                    if len(matches) >= capped:
+                        break
+            return matches
+
+        def capability_summary():
+            return _CAPABILITY_SUMMARY
+
+        runtime_module.MCPError = MCPError
+        runtime_module.call_tool = call_tool
+        runtime_module.batch_call = batch_call
+        runtime_module.list_tools = list_tools
+        runtime_module.list_servers = list_servers
+        runtime_module.list_servers_sync = list_servers_sync
+        runtime_module.discovered_servers = discovered_servers
+        runtime_module.describe_server = describe_server
+        runtime_module.list_loaded_server_metadata = list_loaded_server_metadata
+        runtime_module.list_tools_sync = list_tools_sync
+        runtime_module.query_tool_docs = query_tool_docs
+        runtime_module.search_tool_docs = search_tool_docs
+        runtime_module.query_tool_docs_sync = query_tool_docs_sync
+        runtime_module.search_tool_docs_sync = search_tool_docs_sync
+        runtime_module.capability_summary = capability_summary
+        runtime_module.__all__ = [
+            "MCPError",
+            "call_tool",
+            "batch_call",
+            "list_tools",
+            "list_tools_sync",
+            "list_servers",
+            "list_servers_sync",
+            "discovered_servers",
+            "describe_server",
+            "list_loaded_server_metadata",
+            "query_tool_docs_sync",
+            "query_tool_docs",
+            "search_tool_docs_sync",
+            "search_tool_docs",
+            "capability_summary",
+        ]
+
+        servers_module.__all__ = []
+
+        # Positional-only so tool arguments may reuse these parameter names.
+        async def _invoke_tool(server_name, tool_name, /, **kwargs):
+            return await call_tool(server_name, tool_name, kwargs)
+
+        for server in AVAILABLE_SERVERS:
+            alias = server["alias"]
+            module_name = f"mcp.servers.{alias}"
+            server_module = types.ModuleType(module_name)
+            server_module.__doc__ = f"MCP server '{server['name']}' wrappers"
+            server_module.__all__ = []
+            tool_map = {}
+            for tool in server.get("tools", []):
+                # Interned like the attribute names in user code that look it up
+                tool_alias = sys.intern(tool["alias"])
+                summary = (tool.get("description") or "").strip() or f"MCP tool {tool['name']} from {server['name']}"
+                func = functools.partial(_invoke_tool, server["name"], tool["name"])
+                func.__name__ = tool_alias
+                func.__doc__ = summary
+                setattr(server_module, tool_alias, func)
+                server_module.__all__.append(tool_alias)
+                tool_map[tool_alias] = tool
+            server_module.TOOLS = server.get("tools", [])
+            server_module.TOOL_MAP = tool_map
+            setattr(servers_module, alias, server_module)
+            sys.modules[module_name] = server_module
+            servers_module.__all__.append(alias)
+
+        return runtime_module
+
+
+    runtime_module = _install_mcp_modules()
+
+
+    class _MCPProxy:
+        def __init__(self, server_info):
+            self._server_name = server_info["name"]
+            self._tools = {
+                sys.intern(tool["alias"]): tool for tool in server_info.get("tools", [])
+            }
+
+        async def list_tools(self):
+            response = await _rpc_call(
+                {
+                    "type": "list_tools",
+                    "server": self._server_name,
+                }
+            )
+            if not response.get("success", True):
+                raise RuntimeError(response.get("error", "MCP request failed"))
+            return response.get("tools", [])
+
+        async def call_batch(self, calls, *, max_concurrent=8, stop_on_error=False):
+            '''Call several of this server's tools in one RPC.
+
+            ``calls`` holds ``(tool_alias, arguments)`` pairs; results come back
+            as ``{success, result|error}`` entries in input order.
+            '''
+            batch = []
+            for tool_alias, arguments in calls:
+                tool = self._tools.get(tool_alias)
+                batch.append(
+                    {
+                        "server": self._server_name,
+                        "tool": tool["name"] if tool else tool_alias,
+                        "arguments": arguments or {},
+                    }
+                )
+            return await runtime_module.batch_call(
+                batch, max_concurrent=max_concurrent, stop_on_error=stop_on_error
+            )
+
+        def __getattr__(self, tool_alias):
+            tool = self._tools.get(tool_alias)
+            target = tool.get("name") if tool else tool_alias
+            summary = (tool.get("description") if tool else "") or ""
+
+            async def _invoke(_target=target, **kwargs):
+                response = await _rpc_call(
+                    {
+                        "type": "call_tool",
+                        "server": self._server_name,
+                        "tool": _target,
+                        "arguments": kwargs,
+                    }
+                )
+                if not response.get("success", True):
+                    raise RuntimeError(response.get("error", "MCP call failed"))
+                return response.get("result")
+
+            if summary:
+                _invoke.__doc__ = summary
+            _invoke.__name__ = tool_alias
+            # Later lookups resolve from the instance dict without __getattr__.
+            object.__setattr__(self, tool_alias, _invoke)
+            return _invoke
+
+
+    _MCP_PACKAGE = __import__("mcp")
+    _COMPILE_FLAGS = getattr(ast, "PyCF_ALLOW_TOP_LEVEL_AWAIT", 0)
+    _SANDBOX_GLOBALS = globals()
+    _SANDBOX_GLOBALS.setdefault("mcp", _MCP_PACKAGE)
+    LOADED_MCP_SERVERS = tuple(server["name"] for server in AVAILABLE_SERVERS)
+    mcp_servers = {}
+    # ``mcp_<alias>`` -> proxy, built in the same pass as ``mcp_servers``
+    _PROXY_BINDINGS = {}
+    for server in AVAILABLE_SERVERS:
+        proxy = _MCPProxy(server)
+        mcp_servers[server["name"]] = proxy
+        _PROXY_BINDINGS[f"mcp_{server['alias']}"] = proxy
+
+    _SANDBOX_GLOBALS.update(_PROXY_BINDINGS)
+    _SANDBOX_GLOBALS.setdefault("mcp_servers", {}).update(mcp_servers)
+
+
+    async def _execute():
+        await _ensure_reader()
+        namespace = {
+            "__name__": "__sandbox__",
+            "mcp_servers": mcp_servers,
+            "LOADED_MCP_SERVERS": LOADED_MCP_SERVERS,
+            "mcp": _MCP_PACKAGE,
+            **_PROXY_BINDINGS,
+        }
+        compiled = compile(CODE, "<sandbox>", "exec", flags=_COMPILE_FLAGS)
+        # Top-level await marks the code object as a coroutine at compile time
+        if compiled.co_flags & inspect.CO_COROUTINE:
+            await eval(compiled, namespace, namespace)
+        else:
+            eval(compiled, namespace, namespace)
+        if _READER_TASK:
+            _READER_TASK.cancel()
+            with suppress(asyncio.CancelledError):
+                await _READER_TASK
+
+
+    try:
+        asyncio.run(_execute())
+    except SystemExit:
+        raise
+    except Exception:
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        _STDOUT_PROXY.flush()
+        _STDERR_PROXY.flush()
+    """
+).lstrip()
+
+
+_ENTRYPOINT_PLACEHOLDER_RE = re.compile(
+    r"__(METADATA_JSON|DISCOVERED_JSON|CODE_LITERAL)__"
+)
+
+
+@lru_cache(maxsize=32)
+def _render_entrypoint_source(
+    metadata_json: str, discovered_json: str, code: str
+) -> str:
+    """Substitute the entrypoint placeholders; repeated snippets hit the cache."""
+
+    values = {
+        "METADATA_JSON": repr(metadata_json),
+        "DISCOVERED_JSON": repr(discovered_json),
+        "CODE_LITERAL": repr(code),
+    }
+    # One pass over the template; substituted text is never rescanned.
+    return _ENTRYPOINT_PLACEHOLDER_RE.sub(
+        lambda match: values[match.group(1)], _ENTRYPOINT_TEMPLATE
+    )
+
+
 class RootlessContainerSandbox:
     """Execute Python code in a locked-down container."""
 
@@ -810,24 +1880,35 @@ class RootlessContainerSandbox:
         pids_limit: int = DEFAULT_PIDS,
         cpu_limit: Optional[str] = DEFAULT_CPUS,
         runtime_idle_timeout: int = DEFAULT_RUNTIME_IDLE_TIMEOUT,
+        warm_pool_size: int = DEFAULT_WARM_POOL_SIZE,
+        tmpfs_tmp_size: str = DEFAULT_TMPFS_TMP,
+        tmpfs_workspace_size: str = DEFAULT_TMPFS_WORKSPACE,
     ) -> None:
         self.runtime = detect_runtime(runtime)
         self.image = image
         self.memory_limit = memory_limit
+        self.tmpfs_tmp_size = tmpfs_tmp_size
+        self.tmpfs_workspace_size = tmpfs_workspace_size
         self.pids_limit = pids_limit
         self.cpu_limit = cpu_limit
-        self._runtime_check_lock = asyncio.Lock()
+        # Monotonic deadline until which the runtime is trusted to be up
+        self._runtime_ready_until = 0.0
+        self._runtime_ready_ttl = _RUNTIME_READY_TTL
+        self._runtime_check_task: Optional[asyncio.Task[None]] = None
         self.runtime_idle_timeout = max(0, runtime_idle_timeout)
         self._shutdown_task: Optional[asyncio.Task[None]] = None
         self._share_lock = asyncio.Lock()
         self._shared_paths: set[str] = set()
-
-    def _base_cmd(self) -> List[str]:
+        self.warm_pool_size = max(0, warm_pool_size)
+        self._warm_pool: Dict[Tuple[str, ...], List[_WarmContainer]] = {}
+        self._warm_refilling: set[Tuple[str, ...]] = set()
+        self._warm_tasks: set[asyncio.Task[None]] = set()
+        # The run flags only depend on constructor arguments; build them once.
+        self._base_cmd_template = self._build_base_cmd()
+
+    def _build_base_cmd(self) -> Optional[Tuple[str, ...]]:
         if not self.runtime:
-            raise SandboxError(
-                "No container runtime found. Install podman or rootless docker and set "
-                "MCP_BRIDGE_RUNTIME if multiple runtimes are available."
-            )
+            return None
         cmd: List[str] = [
             self.runtime,
             "run",
@@ -840,10 +1921,13 @@ class RootlessContainerSandbox:
             str(self.pids_limit),
             "--memory",
             self.memory_limit,
+            # Equal to --memory: no swap on top of the memory limit
+            "--memory-swap",
+            self.memory_limit,
             "--tmpfs",
-            "/tmp:rw,noexec,nosuid,nodev,size=64m",
+            f"/tmp:rw,noexec,nosuid,nodev,size={self.tmpfs_tmp_size}",
             "--tmpfs",
-            "/workspace:rw,noexec,nosuid,nodev,size=128m",
+            f"/workspace:rw,noexec,nosuid,nodev,size={self.tmpfs_workspace_size}",
             "--workdir",
             "/workspace",
             "--env",
@@ -863,489 +1947,30 @@ class RootlessContainerSandbox:
         ]
         if self.cpu_limit:
             cmd.extend(["--cpus", self.cpu_limit])
-        return cmd
+        return tuple(cmd)
+
+    def _base_cmd(self) -> List[str]:
+        if self._base_cmd_template is None:
+            raise SandboxError(
+                "No container runtime found. Install podman or rootless docker and set "
+                "MCP_BRIDGE_RUNTIME if multiple runtimes are available."
+            )
+        return list(self._base_cmd_template)
 
     def _render_entrypoint(
         self,
         code: str,
         servers_metadata: Sequence[Dict[str, object]],
         discovered_servers: Dict[str, str],
+        *,
+        metadata_json: Optional[str] = None,
+        discovered_json: Optional[str] = None,
     ) -> str:
-        metadata_json = json.dumps(servers_metadata, separators=(",", ":"))
-        discovered_json = json.dumps(discovered_servers, separators=(",", ":"))
-        template = textwrap.dedent(
-            """
-            import asyncio
-            import inspect
-            import json
-            import sys
-            import traceback
-            import types
-            from contextlib import suppress
-            from pathlib import Path
-
-            AVAILABLE_SERVERS = json.loads(__METADATA_JSON__)
-            DISCOVERED_SERVERS = json.loads(__DISCOVERED_JSON__)
-            CODE = __CODE_LITERAL__
-            USER_TOOLS_PATH = Path("/projects/user_tools.py")
-
-            _PENDING_RESPONSES = {}
-            _REQUEST_COUNTER = 0
-            _READER_TASK = None
-
-            def _send_message(message):
-                sys.__stdout__.write(json.dumps(message, separators=(",", ":")) + "\\n")
-                sys.__stdout__.flush()
-
-            class _StreamProxy:
-                def __init__(self, kind):
-                    self._kind = kind
-
-                def write(self, data):
-                    if not data:
-                        return
-                    _send_message({"type": self._kind, "data": data})
-
-                def flush(self):
-                    pass
-
-                def isatty(self):
-                    return False
-
-            sys.stdout = _StreamProxy("stdout")
-            sys.stderr = _StreamProxy("stderr")
-
-            async def _stdin_reader():
-                loop = asyncio.get_running_loop()
-                reader = asyncio.StreamReader()
-                protocol = asyncio.StreamReaderProtocol(reader)
-                transport = None
-
-                try:
-                    transport, _ = await loop.connect_read_pipe(lambda: protocol, sys.stdin)
-                    while True:
-                        line = await reader.readline()
-                        if not line:
-                            break
-                        try:
-                            message = json.loads(line.decode())
-                        except Exception:
-                            continue
-                        if message.get("type") != "rpc_response":
-                            continue
-                        request_id = message.get("id")
-                        future = _PENDING_RESPONSES.pop(request_id, None)
-                        if future and not future.done():
-                            if message.get("success", True):
-                                future.set_result(message.get("payload"))
-                            else:
-                                future.set_exception(RuntimeError(message.get("error", "RPC error")))
-                finally:
-                    if transport is not None:
-                        transport.close()
-                    for future in list(_PENDING_RESPONSES.values()):
-                        if not future.done():
-                            future.set_exception(RuntimeError("RPC channel closed"))
-
-            async def _ensure_reader():
-                global _READER_TASK
-                if _READER_TASK is None:
-                    _READER_TASK = asyncio.create_task(_stdin_reader())
-
-            async def _rpc_call(payload):
-                await _ensure_reader()
-                loop = asyncio.get_running_loop()
-                global _REQUEST_COUNTER
-                _REQUEST_COUNTER += 1
-                request_id = _REQUEST_COUNTER
-                future = loop.create_future()
-                _PENDING_RESPONSES[request_id] = future
-                _send_message({"type": "rpc_request", "id": request_id, "payload": payload})
-                return await future
-
-            def _install_mcp_modules():
-                mcp_pkg = types.ModuleType("mcp")
-                mcp_pkg.__path__ = []
-                mcp_pkg.__all__ = ["runtime", "servers"]
-                sys.modules["mcp"] = mcp_pkg
-
-                runtime_module = types.ModuleType("mcp.runtime")
-                servers_module = types.ModuleType("mcp.servers")
-                servers_module.__path__ = []
-                sys.modules["mcp.runtime"] = runtime_module
-                sys.modules["mcp.servers"] = servers_module
-                mcp_pkg.runtime = runtime_module
-                mcp_pkg.servers = servers_module
-
-                # Load user tools if they exist
-                if USER_TOOLS_PATH.exists():
-                    try:
-                        import importlib.util
-                        spec = importlib.util.spec_from_file_location("user_tools", USER_TOOLS_PATH)
-                        if spec and spec.loader:
-                            user_tools = importlib.util.module_from_spec(spec)
-                            sys.modules["user_tools"] = user_tools
-                            spec.loader.exec_module(user_tools)
-                            # Export everything from user_tools to global namespace
-                            for name, val in vars(user_tools).items():
-                                if not name.startswith("_"):
-                                    globals()[name] = val
-                    except Exception:
-                        # We silently ignore errors during tool loading to not break startup
-                        pass
-
-                def save_tool(func):
-                    '''Saves a function as a persistent tool available in future sessions.'''
-                    if not inspect.isfunction(func):
-                        raise ValueError("save_tool expects a function")
-                    
-                    source = inspect.getsource(func)
-                    # Ensure the file exists
-                    USER_TOOLS_PATH.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Append to file
-                    with open(USER_TOOLS_PATH, "a") as f:
-                        f.write("\\n\\n")
-                        f.write(source)
-                    
-                    return f"Tool '{func.__name__}' saved. It will be available in future sessions."
-
-                # Expose save_tool to runtime
-                runtime_module.save_tool = save_tool
-                globals()["save_tool"] = save_tool
-
-                class MCPError(RuntimeError):
-                    'Raised when an MCP call fails.'
-
-                _CAPABILITY_SUMMARY = (
-                    "--- PYTHON SANDBOX MANUAL ---\\n"
-                    "1. PHILOSOPHY: You are in a persistent Python environment. Prefer writing code over calling tools when possible.\\n"
-                    "2. DISCOVERY: Use `runtime.discovered_servers()` to list servers. "
-                    "Use `runtime.discovered_servers(detailed=True)` for descriptions. "
-                    "Use `runtime.search_tool_docs('query')` to find tools. "
-                    "Don't guess tool names; search first.\\n"
-                    "3. PERSISTENCE: You can save your own tools! Define a Python function and call `save_tool(func)`. "
-                    "It will be saved to `~/MCPs/user_tools.py` and auto-loaded in future sessions.\\n"
-                    "4. HELPERS: `import mcp.runtime as runtime`. Available: list_servers(), list_tools_sync(server), "
-                    "query_tool_docs(server), describe_server(name).\\n"
-                    "5. PROXIES: Loaded servers are available as `mcp_<alias>` (e.g. `await mcp_filesystem.read_file(...)`)."
-                )
-
-                _LOADED_SERVER_NAMES = tuple(server.get("name") for server in AVAILABLE_SERVERS)
-
-                def _lookup_server(name):
-                    for server in AVAILABLE_SERVERS:
-                        if server.get("name") == name:
-                            return server
-                    raise MCPError(f"Server {name!r} is not loaded")
-
-                def _normalise_detail(value):
-                    detail = str(value).lower() if value is not None else "summary"
-                    return detail if detail in {"summary", "full"} else "summary"
-
-                def _format_tool_doc(server_info, tool_info, detail):
-                    doc = {
-                        "server": server_info.get("name"),
-                        "serverAlias": server_info.get("alias"),
-                        "tool": tool_info.get("name"),
-                        "toolAlias": tool_info.get("alias"),
-                    }
-                    description = tool_info.get("description")
-                    if description:
-                        doc["description"] = description
-                    if detail == "full" and tool_info.get("input_schema") is not None:
-                        doc["inputSchema"] = tool_info.get("input_schema")
-                    return doc
-
-                async def call_tool(server, tool, arguments=None):
-                    response = await _rpc_call(
-                        {
-                            "type": "call_tool",
-                            "server": server,
-                            "tool": tool,
-                            "arguments": arguments or {},
-                        }
-                    )
-                    if not response.get("success", True):
-                        raise MCPError(response.get("error", "MCP request failed"))
-                    return response.get("result")
-
-                async def list_tools(server):
-                    response = await _rpc_call(
-                        {
-                            "type": "list_tools",
-                            "server": server,
-                        }
-                    )
-                    if not response.get("success", True):
-                        raise MCPError(response.get("error", "MCP request failed"))
-                    return response.get("tools", [])
-
-                async def list_servers():
-                    response = await _rpc_call({"type": "list_servers"})
-                    if not response.get("success", True):
-                        raise MCPError(response.get("error", "MCP request failed"))
-                    return tuple(response.get("servers", ()))
-
-                def list_servers_sync():
-                    return tuple(name for name in _LOADED_SERVER_NAMES if name)
-
-                def discovered_servers(detailed=False):
-                    if detailed:
-                        return tuple({"name": k, "description": v} for k, v in DISCOVERED_SERVERS.items())
-                    return tuple(DISCOVERED_SERVERS.keys())
-
-                def describe_server(name):
-                    return _lookup_server(name)
-
-                def list_loaded_server_metadata():
-                    return tuple(AVAILABLE_SERVERS)
-
-                def list_tools_sync(server=None):
-                    if server is None:
-                        raise MCPError("list_tools_sync(server) requires a server name")
-                    info = _lookup_server(server)
-                    tools = info.get("tools", ()) or ()
-                    return tuple(tools)
-
-                async def query_tool_docs(server, tool=None, detail="summary"):
-                    payload = {"type": "query_tool_docs", "server": server}
-                    if tool is not None:
-                        payload["tool"] = tool
-                    if detail is not None:
-                        payload["detail"] = detail
-                    response = await _rpc_call(payload)
-                    if not response.get("success", True):
-                        raise MCPError(response.get("error", "MCP request failed"))
-                    docs = response.get("docs", [])
-                    if tool is not None and isinstance(docs, list) and len(docs) == 1:
-                        return docs[0]
-                    return docs
-
-                async def search_tool_docs(query, *, limit=5, detail="summary"):
-                    payload = {"type": "search_tool_docs", "query": query}
-                    if limit is not None:
-                        payload["limit"] = limit
-                    if detail is not None:
-                        payload["detail"] = detail
-                    response = await _rpc_call(payload)
-                    if not response.get("success", True):
-                        raise MCPError(response.get("error", "MCP request failed"))
-                    return response.get("results", [])
-
-                def query_tool_docs_sync(server, tool=None, detail="summary"):
-                    info = _lookup_server(server)
-                    detail_value = _normalise_detail(detail)
-                    tools = info.get("tools", ()) or ()
-                    if tool is None:
-                        return [_format_tool_doc(info, tool_info, detail_value) for tool_info in tools]
-
-                    if not isinstance(tool, str):
-                        raise MCPError("'tool' must be a string when provided")
-                    target = tool.lower()
-                    for candidate in tools:
-                        alias_value = str(candidate.get("alias", "")).lower()
-                        name_value = str(candidate.get("name", "")).lower()
-                        if target in {alias_value, name_value}:
-                            return [_format_tool_doc(info, candidate, detail_value)]
-                    raise MCPError(f"Tool {tool!r} not found for server {server}")
-
-                def search_tool_docs_sync(query, *, limit=5, detail="summary"):
-                    tokens = [token for token in str(query).lower().split() if token]
-                    if not tokens:
-                        return []
-                    detail_value = _normalise_detail(detail)
-                    try:
-                        capped = max(1, min(20, int(limit)))
-                    except Exception:
-                        capped = 5
-                    matches = []
-                    for server_info in AVAILABLE_SERVERS:
-                        tools = server_info.get("tools", ()) or ()
-                        server_keywords = " ".join(
-                            filter(
-                                None,
-                                (
-                                    server_info.get("name"),
-                                    server_info.get("alias"),
-                                ),
-                            )
-                        ).lower()
-                        for tool_info in tools:
-                            haystack = " ".join(
-                                filter(
-                                    None,
-                                    (
-                                        server_keywords,
-                                        tool_info.get("name"),
-                                        tool_info.get("alias"),
-                                        tool_info.get("description"),
-                                    ),
-                                )
-                            ).lower()
-                            if all(token in haystack for token in tokens):
-                                matches.append(_format_tool_doc(server_info, tool_info, detail_value))
-                                if len(matches) >= capped:
-                                    return matches
-                    return matches
-
-                def capability_summary():
-                    return _CAPABILITY_SUMMARY
-
-                runtime_module.MCPError = MCPError
-                runtime_module.call_tool = call_tool
-                runtime_module.list_tools = list_tools
-                runtime_module.list_servers = list_servers
-                runtime_module.list_servers_sync = list_servers_sync
-                runtime_module.discovered_servers = discovered_servers
-                runtime_module.describe_server = describe_server
-                runtime_module.list_loaded_server_metadata = list_loaded_server_metadata
-                runtime_module.list_tools_sync = list_tools_sync
-                runtime_module.query_tool_docs = query_tool_docs
-                runtime_module.search_tool_docs = search_tool_docs
-                runtime_module.query_tool_docs_sync = query_tool_docs_sync
-                runtime_module.search_tool_docs_sync = search_tool_docs_sync
-                runtime_module.capability_summary = capability_summary
-                runtime_module.__all__ = [
-                    "MCPError",
-                    "call_tool",
-                    "list_tools",
-                    "list_tools_sync",
-                    "list_servers",
-                    "list_servers_sync",
-                    "discovered_servers",
-                    "describe_server",
-                    "list_loaded_server_metadata",
-                    "query_tool_docs_sync",
-                    "query_tool_docs",
-                    "search_tool_docs_sync",
-                    "search_tool_docs",
-                    "capability_summary",
-                ]
-
-                servers_module.__all__ = []
-
-                def _make_tool_callable(server_name, tool_name):
-                    async def _invoke(**kwargs):
-                        return await call_tool(server_name, tool_name, kwargs)
-
-                    return _invoke
-
-                for server in AVAILABLE_SERVERS:
-                    alias = server["alias"]
-                    module_name = f"mcp.servers.{alias}"
-                    server_module = types.ModuleType(module_name)
-                    server_module.__doc__ = f"MCP server '{server['name']}' wrappers"
-                    server_module.__all__ = []
-                    tool_map = {}
-                    for tool in server.get("tools", []):
-                        tool_alias = tool["alias"]
-                        summary = (tool.get("description") or "").strip() or f"MCP tool {tool['name']} from {server['name']}"
-                        func = _make_tool_callable(server["name"], tool["name"])
-                        func.__name__ = tool_alias
-                        func.__doc__ = summary
-                        setattr(server_module, tool_alias, func)
-                        server_module.__all__.append(tool_alias)
-                        tool_map[tool_alias] = tool
-                    server_module.TOOLS = server.get("tools", [])
-                    server_module.TOOL_MAP = tool_map
-                    setattr(servers_module, alias, server_module)
-                    sys.modules[module_name] = server_module
-                    servers_module.__all__.append(alias)
-
-                return runtime_module
-
-
-            runtime_module = _install_mcp_modules()
-
-
-            class _MCPProxy:
-                def __init__(self, server_info):
-                    self._server_name = server_info["name"]
-                    self._tools = {tool["alias"]: tool for tool in server_info.get("tools", [])}
-
-                async def list_tools(self):
-                    response = await _rpc_call(
-                        {
-                            "type": "list_tools",
-                            "server": self._server_name,
-                        }
-                    )
-                    if not response.get("success", True):
-                        raise RuntimeError(response.get("error", "MCP request failed"))
-                    return response.get("tools", [])
-
-                def __getattr__(self, tool_alias):
-                    tool = self._tools.get(tool_alias)
-                    target = tool.get("name") if tool else tool_alias
-                    summary = (tool.get("description") if tool else "") or ""
-
-                    async def _invoke(_target=target, **kwargs):
-                        response = await _rpc_call(
-                            {
-                                "type": "call_tool",
-                                "server": self._server_name,
-                                "tool": _target,
-                                "arguments": kwargs,
-                            }
-                        )
-                        if not response.get("success", True):
-                            raise RuntimeError(response.get("error", "MCP call failed"))
-                        return response.get("result")
-
-                    if summary:
-                        _invoke.__doc__ = summary
-                    _invoke.__name__ = tool_alias
-                    return _invoke
-
-
-            _SANDBOX_GLOBALS = globals()
-            _SANDBOX_GLOBALS.setdefault("mcp", __import__("mcp"))
-            LOADED_MCP_SERVERS = tuple(server["name"] for server in AVAILABLE_SERVERS)
-            mcp_servers = {}
-            for server in AVAILABLE_SERVERS:
-                proxy = _MCPProxy(server)
-                mcp_servers[server["name"]] = proxy
-                _SANDBOX_GLOBALS[f"mcp_{server['alias']}"] = proxy
-
-            _SANDBOX_GLOBALS.setdefault("mcp_servers", {}).update(mcp_servers)
-
-            alias_map = {server["name"]: server["alias"] for server in AVAILABLE_SERVERS}
-
-
-            async def _execute():
-                await _ensure_reader()
-                namespace = {"__name__": "__sandbox__"}
-                namespace["mcp_servers"] = mcp_servers
-                namespace["LOADED_MCP_SERVERS"] = LOADED_MCP_SERVERS
-                namespace["mcp"] = __import__("mcp")
-                for server_name, proxy in mcp_servers.items():
-                    namespace[f"mcp_{alias_map[server_name]}"] = proxy
-                flags = getattr(__import__("ast"), "PyCF_ALLOW_TOP_LEVEL_AWAIT", 0)
-                compiled = compile(CODE, "<sandbox>", "exec", flags=flags)
-                result = eval(compiled, namespace, namespace)
-                if inspect.isawaitable(result):
-                    await result
-                if _READER_TASK:
-                    _READER_TASK.cancel()
-                    with suppress(asyncio.CancelledError):
-                        await _READER_TASK
-
-
-            try:
-                asyncio.run(_execute())
-            except SystemExit:
-                raise
-            except Exception:
-                traceback.print_exc()
-                sys.exit(1)
-            """
-        ).lstrip()
-        return (
-            template.replace("__METADATA_JSON__", repr(metadata_json))
-            .replace("__DISCOVERED_JSON__", repr(discovered_json))
-            .replace("__CODE_LITERAL__", repr(code))
-        )
+        if metadata_json is None:
+            metadata_json = _dumps_compact(servers_metadata)
+        if discovered_json is None:
+            discovered_json = _dumps_compact(discovered_servers)
+        return _render_entrypoint_source(metadata_json, discovered_json, code)
 
     async def _run_runtime_command(self, *args: str) -> tuple[int, str, str]:
         process = await asyncio.create_subprocess_exec(
@@ -1367,6 +1992,7 @@ class RootlessContainerSandbox:
         if "podman" not in runtime_name:
             return
 
+        self._runtime_ready_until = 0.0
         code, stdout_text, stderr_text = await self._run_runtime_command(
             "machine", "stop"
         )
@@ -1394,6 +2020,7 @@ class RootlessContainerSandbox:
         async def _delayed_shutdown() -> None:
             try:
                 await asyncio.sleep(self.runtime_idle_timeout)
+                await self._drain_warm_pool()
                 await self._stop_runtime()
             except asyncio.CancelledError:
                 raise
@@ -1403,82 +2030,101 @@ class RootlessContainerSandbox:
         self._shutdown_task = asyncio.create_task(_delayed_shutdown())
 
     async def _ensure_runtime_ready(self) -> None:
-        async with self._runtime_check_lock:
-            await self._cancel_runtime_shutdown_timer()
-            if not self.runtime:
-                # We will fail later when trying to run the command, but for now
-                # we can't do any runtime specific checks
-                return
-
-            runtime_name = os.path.basename(self.runtime)
-            if "podman" not in runtime_name:
-                return
+        await self._cancel_runtime_shutdown_timer()
+        if time.monotonic() < self._runtime_ready_until:
+            return
 
-            for _ in range(3):
-                code, stdout_text, stderr_text = await self._run_runtime_command(
-                    "info",
-                    "--format",
-                    "{{json .}}",
-                )
-                if code == 0:
-                    return
+        # Concurrent callers share one in-flight check instead of queueing on
+        # a lock; once it succeeds the flag keeps later calls lock-free.
+        task = self._runtime_check_task
+        if task is None:
+            task = asyncio.create_task(self._prepare_runtime())
+            self._runtime_check_task = task
+        try:
+            await asyncio.shield(task)
+        except BaseException:
+            if task.done() and self._runtime_check_task is task:
+                self._runtime_check_task = None
+            raise
+        if self._runtime_check_task is task:
+            self._runtime_check_task = None
+        self._runtime_ready_until = time.monotonic() + self._runtime_ready_ttl
 
-                combined = f"{stdout_text}\n{stderr_text}".lower()
-                needs_machine = any(
-                    phrase in combined
-                    for phrase in (
-                        "cannot connect to podman",
-                        "podman machine",
-                        "run the podman machine",
-                        "socket: connect",
-                    )
-                )
-                if not needs_machine:
-                    raise SandboxError(
-                        "Container runtime is unavailable",
-                        stdout=stdout_text,
-                        stderr=stderr_text,
-                    )
+    async def _prepare_runtime(self) -> None:
+        if not self.runtime:
+            # We will fail later when trying to run the command, but for now
+            # we can't do any runtime specific checks
+            return
 
-                (
-                    start_code,
-                    start_stdout,
-                    start_stderr,
-                ) = await self._run_runtime_command("machine", "start")
-                if start_code == 0:
-                    continue
+        runtime_name = os.path.basename(self.runtime)
+        if "podman" not in runtime_name:
+            return
 
-                start_combined = f"{start_stdout}\n{start_stderr}".lower()
-                if (
-                    "does not exist" in start_combined
-                    or "no such machine" in start_combined
-                ):
-                    (
-                        init_code,
-                        init_stdout,
-                        init_stderr,
-                    ) = await self._run_runtime_command("machine", "init")
-                    if init_code != 0:
-                        raise SandboxError(
-                            "Failed to initialize Podman machine",
-                            stdout=init_stdout,
-                            stderr=init_stderr,
-                        )
-                    # After init, loop will retry info/start sequence
-                    continue
+        for _ in range(3):
+            code, stdout_text, stderr_text = await self._run_runtime_command(
+                "info",
+                "--format",
+                "{{json .}}",
+            )
+            if code == 0:
+                return
 
+            combined = f"{stdout_text}\n{stderr_text}".lower()
+            needs_machine = any(
+                phrase in combined
+                for phrase in (
+                    "cannot connect to podman",
+                    "podman machine",
+                    "run the podman machine",
+                    "socket: connect",
+                )
+            )
+            if not needs_machine:
                 raise SandboxError(
-                    "Failed to start Podman machine",
-                    stdout=start_stdout,
-                    stderr=start_stderr,
+                    "Container runtime is unavailable",
+                    stdout=stdout_text,
+                    stderr=stderr_text,
                 )
 
+            (
+                start_code,
+                start_stdout,
+                start_stderr,
+            ) = await self._run_runtime_command("machine", "start")
+            if start_code == 0:
+                continue
+
+            start_combined = f"{start_stdout}\n{start_stderr}".lower()
+            if (
+                "does not exist" in start_combined
+                or "no such machine" in start_combined
+            ):
+                (
+                    init_code,
+                    init_stdout,
+                    init_stderr,
+                ) = await self._run_runtime_command("machine", "init")
+                if init_code != 0:
+                    raise SandboxError(
+                        "Failed to initialize Podman machine",
+                        stdout=init_stdout,
+                        stderr=init_stderr,
+                    )
+                # After init, loop will retry info/start sequence
+                continue
+
             raise SandboxError(
-                "Unable to prepare Podman runtime",
-                stdout="",
-                stderr="Repeated podman machine start attempts failed",
+                "Failed to start Podman machine",
+                stdout=start_stdout,
+                stderr=start_stderr,
             )
 
+        raise SandboxError(
+            "Unable to prepare Podman runtime",
+            stdout="",
+            stderr="Repeated podman machine start attempts failed",
+        )
+
     async def execute(
         self,
         code: str,
@@ -1502,41 +2148,117 @@ class RootlessContainerSandbox:
         if host_dir is None:
             raise SandboxError("Sandbox host directory is not available")
 
-        entrypoint_path = host_dir / "entrypoint.py"
-        entrypoint_path.write_text(
-            self._render_entrypoint(code, servers_metadata, discovered_servers)
+        # SandboxInvocation already serialised the same metadata for the
+        # container environment; reuse those documents when present.
+        env = container_env or {}
+        entrypoint_source = self._render_entrypoint(
+            code,
+            servers_metadata,
+            discovered_servers,
+            metadata_json=env.get("MCP_AVAILABLE_SERVERS"),
+            discovered_json=env.get("MCP_DISCOVERED_SERVERS"),
         )
-        entrypoint_target = f"/ipc/{entrypoint_path.name}"
 
-        stdout_chunks: List[str] = []
-        stderr_chunks: List[str] = []
-
-        cmd = self._base_cmd()
-        if volume_mounts:
-            for mount in volume_mounts:
-                cmd.extend(["--volume", mount])
-        if container_env:
-            for key, value in container_env.items():
-                cmd.extend(["--env", f"{key}={value}"])
-        cmd.extend([self.image, "python3", "-u", entrypoint_target])
+        # Bounded so a runaway sandbox cannot exhaust the bridge's memory
+        stdout_chunks = _BoundedTextBuffer()
+        stderr_chunks = _BoundedTextBuffer()
+
+        process: Optional[aio_subprocess.Process] = None
+        if self.warm_pool_size > 0:
+            # The per-invocation /ipc mount cannot be attached to a container
+            # that is already running; the entrypoint travels over stdin instead.
+            shared_mounts = tuple(
+                mount
+                for mount in volume_mounts or ()
+                if not mount.startswith(f"{host_dir}:")
+            )
+            process = await self._dispatch_to_warm_container(
+                shared_mounts, entrypoint_source, container_env or {}
+            )
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdin=aio_subprocess.PIPE,
-            stdout=aio_subprocess.PIPE,
-            stderr=aio_subprocess.PIPE,
-        )
+        if process is None:
+            entrypoint_path = host_dir / "entrypoint.py"
+            _write_file_bytes(entrypoint_path, entrypoint_source.encode("utf-8"))
+            entrypoint_target = f"/ipc/{entrypoint_path.name}"
+            cmd = self._container_cmd(volume_mounts, container_env)
+            cmd.extend([self.image, "python3", "-u", entrypoint_target])
+            process = await self._spawn_container(cmd)
+
+        # RPC requests are served concurrently so sandboxed code that gathers
+        # several tool calls is not serialised behind the slowest one; replies
+        # are matched by id on the sandbox side.
+        rpc_tasks: set[asyncio.Task[None]] = set()
+        rpc_slots = asyncio.Semaphore(_MAX_CONCURRENT_RPCS)
+        stdin_lock = asyncio.Lock()
+
+        async def _send_rpc_reply(
+            message_id: object, response: Dict[str, object]
+        ) -> None:
+            if process.stdin is None:
+                return
+            try:
+                success = response.get("success", True)
+                if success is True:
+                    # Fixed envelope: only the id and payload need encoding.
+                    data = _RPC_REPLY_OK % (
+                        _dumps_compact_bytes(message_id),
+                        _dumps_compact_bytes(response),
+                    )
+                else:
+                    reply: Dict[str, object] = {
+                        "type": "rpc_response",
+                        "id": message_id,
+                        "success": success,
+                        "payload": response,
+                    }
+                    if not success:
+                        reply["error"] = response.get("error", "RPC error")
+                    data = _dumps_compact_bytes(reply) + b"\n"
+                async with stdin_lock:
+                    process.stdin.write(data)
+                    await process.stdin.drain()
+            except Exception:
+                stderr_chunks.append("Failed to deliver RPC response\n")
+
+        async def _serve_rpc(
+            handler: Callable[[Dict[str, object]], Awaitable[Dict[str, object]]],
+            message_id: object,
+            payload: Dict[str, object],
+        ) -> None:
+            async with rpc_slots:
+                try:
+                    response = await handler(payload)
+                except Exception as exc:
+                    logger.debug("RPC handler failed", exc_info=True)
+                    response = {"success": False, "error": str(exc)}
+            await _send_rpc_reply(message_id, response)
+
+        async def _cancel_rpc_tasks() -> None:
+            pending = list(rpc_tasks)
+            for task in pending:
+                task.cancel()
+            for task in pending:
+                with suppress(asyncio.CancelledError):
+                    await task
 
         async def _handle_stdout() -> None:
             if not process.stdout:
                 return
+            readline = process.stdout.readline
             while True:
-                line = await process.stdout.readline()
+                line = await readline()
                 if not line:
                     break
-                try:
-                    message = json.loads(line.decode())
-                except Exception:
+                message: object = None
+                # Framed messages are JSON objects; anything else (e.g. output
+                # of a child process sharing fd 1) skips the parse attempt.
+                if line.startswith(b"{"):
+                    try:
+                        message = _loads_json(line)
+                    except Exception:
+                        message = None
+                if not isinstance(message, dict):
+                    # Raw bytes written straight to fd 1 bypass the JSON framing
                     stderr_chunks.append(line.decode(errors="replace"))
                     continue
 
@@ -1546,51 +2268,39 @@ class RootlessContainerSandbox:
                 elif msg_type == "stderr":
                     stderr_chunks.append(message.get("data", ""))
                 elif msg_type == "rpc_request":
-                    if process.stdin is None:
+                    if process.stdin is None or process.returncode is not None:
                         continue
                     if rpc_handler is None:
-                        response: Dict[str, object] = {
-                            "success": False,
-                            "error": "RPC handler unavailable",
-                        }
-                    else:
-                        try:
-                            payload = message.get("payload", {})
-                            response = await rpc_handler(
-                                payload if isinstance(payload, dict) else {}
-                            )
-                        except Exception as exc:
-                            logger.debug("RPC handler failed", exc_info=True)
-                            response = {"success": False, "error": str(exc)}
-                    reply: Dict[str, object] = {
-                        "type": "rpc_response",
-                        "id": message.get("id"),
-                        "success": response.get("success", True),
-                        "payload": response,
-                    }
-                    if not reply["success"]:
-                        reply["error"] = response.get("error", "RPC error")
-                    try:
-                        data = (
-                            json.dumps(reply, separators=(",", ":")).encode("utf-8")
-                            + b"\n"
+                        await _send_rpc_reply(
+                            message.get("id"),
+                            {"success": False, "error": "RPC handler unavailable"},
                         )
-                        process.stdin.write(data)
-                        await process.stdin.drain()
-                    except Exception:
-                        stderr_chunks.append("Failed to deliver RPC response\n")
-                        break
+                        continue
+                    payload = message.get("payload", {})
+                    task = asyncio.create_task(
+                        _serve_rpc(
+                            rpc_handler,
+                            message.get("id"),
+                            payload if isinstance(payload, dict) else {},
+                        )
+                    )
+                    rpc_tasks.add(task)
+                    task.add_done_callback(rpc_tasks.discard)
                 else:
                     stderr_chunks.append(json.dumps(message, separators=(",", ":")))
 
         async def _read_stderr() -> None:
             if not process.stderr:
                 return
+            # Incremental decoding keeps multi-byte characters that straddle a
+            # read boundary intact instead of turning them into U+FFFD.
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
             while True:
-                chunk = await process.stderr.read(4096)
+                chunk = await process.stderr.read(65536)
                 if not chunk:
                     break
-                stderr_chunks.append(chunk.decode(errors="replace"))
+                stderr_chunks.append(decoder.decode(chunk))
+            stderr_chunks.append(decoder.decode(b"", final=True))
 
         stdout_task = asyncio.create_task(_handle_stdout())
         stderr_task = asyncio.create_task(_read_stderr())
@@ -1608,10 +2318,11 @@ class RootlessContainerSandbox:
                 await stderr_task
             raise SandboxTimeout(
                 f"Execution timed out after {timeout}s",
-                stdout="".join(stdout_chunks),
-                stderr="".join(stderr_chunks),
+                stdout=stdout_chunks.getvalue(),
+                stderr=stderr_chunks.getvalue(),
             ) from exc
         finally:
+            await _cancel_rpc_tasks()
             if process.stdin:
                 process.stdin.close()
                 with suppress(Exception):
@@ -1620,8 +2331,8 @@ class RootlessContainerSandbox:
         await stdout_task
         await stderr_task
 
-        stdout_text = "".join(stdout_chunks)
-        stderr_text = "".join(stderr_chunks)
+        stdout_text = stdout_chunks.getvalue()
+        stderr_text = stderr_chunks.getvalue()
 
         if process.returncode == 0:
             stderr_text = self._filter_runtime_stderr(stderr_text)
@@ -1629,10 +2340,145 @@ class RootlessContainerSandbox:
         try:
             exit_code = process.returncode
             assert exit_code is not None
+            if exit_code == _RUNTIME_FAILURE_EXIT_CODE:
+                # The runtime itself failed (e.g. the podman machine went
+                # away); verify it again before the next run.
+                self._runtime_ready_until = 0.0
             return SandboxResult(exit_code == 0, exit_code, stdout_text, stderr_text)
         finally:
             await self._schedule_runtime_shutdown()
 
+    def _container_cmd(
+        self,
+        volume_mounts: Optional[Sequence[str]],
+        container_env: Optional[Dict[str, str]],
+    ) -> List[str]:
+        cmd = self._base_cmd()
+        if volume_mounts:
+            for mount in volume_mounts:
+                cmd.extend(["--volume", mount])
+        if container_env:
+            for key, value in container_env.items():
+                cmd.extend(["--env", f"{key}={value}"])
+        return cmd
+
+    async def _spawn_container(self, cmd: Sequence[str]) -> aio_subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=aio_subprocess.PIPE,
+            stdout=aio_subprocess.PIPE,
+            stderr=aio_subprocess.PIPE,
+            limit=_STREAM_LIMIT,
+        )
+
+    async def _start_warm_container(self, mounts: Tuple[str, ...]) -> _WarmContainer:
+        cmd = self._container_cmd(mounts, None)
+        cmd.extend([self.image, "python3", "-u", "-c", _WARM_CONTAINER_BOOTSTRAP])
+        process = await self._spawn_container(cmd)
+        return _WarmContainer(process=process, started_at=time.monotonic())
+
+    def _warm_container_usable(self, container: _WarmContainer) -> bool:
+        if container.process.returncode is not None:
+            return False
+        if self.runtime_idle_timeout <= 0:
+            return True
+        age = time.monotonic() - container.started_at
+        return age < self.runtime_idle_timeout
+
+    async def _take_warm_container(self, mounts: Tuple[str, ...]) -> _WarmContainer:
+        pool = self._warm_pool.get(mounts, [])
+        taken: Optional[_WarmContainer] = None
+        while pool:
+            candidate = pool.pop()
+            if self._warm_container_usable(candidate):
+                taken = candidate
+                break
+            await self._discard_warm_container(candidate)
+        if taken is None:
+            taken = await self._start_warm_container(mounts)
+        self._schedule_warm_refill(mounts)
+        return taken
+
+    async def _dispatch_to_warm_container(
+        self,
+        mounts: Tuple[str, ...],
+        entrypoint_source: str,
+        container_env: Dict[str, str],
+    ) -> Optional[aio_subprocess.Process]:
+        """Hand the rendered entrypoint to a pre-started container.
+
+        Returns ``None`` when the frame cannot be delivered so the caller can
+        fall back to a cold ``run``.
+        """
+
+        container = await self._take_warm_container(mounts)
+        process = container.process
+        frame = _dumps_compact_bytes(
+            {"source": entrypoint_source, "env": container_env}
+        )
+        try:
+            assert process.stdin is not None
+            process.stdin.write(f"{len(frame)}\n".encode("ascii") + frame)
+            await process.stdin.drain()
+        except Exception:
+            logger.debug("Failed to dispatch to warm container", exc_info=True)
+            await self._discard_warm_container(container)
+            return None
+        return process
+
+    def _schedule_warm_refill(self, mounts: Tuple[str, ...]) -> None:
+        if self.warm_pool_size <= 0 or mounts in self._warm_refilling:
+            return
+        self._warm_refilling.add(mounts)
+        task = asyncio.create_task(self._refill_warm_pool(mounts))
+        self._warm_tasks.add(task)
+        task.add_done_callback(self._warm_tasks.discard)
+
+    async def _refill_warm_pool(self, mounts: Tuple[str, ...]) -> None:
+        try:
+            pool = self._warm_pool.setdefault(mounts, [])
+            while len(pool) < self.warm_pool_size:
+                pool.append(await self._start_warm_container(mounts))
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # pragma: no cover - diagnostic fallback
+            logger.debug("Failed to pre-start warm container", exc_info=True)
+        finally:
+            self._warm_refilling.discard(mounts)
+
+    async def _discard_warm_container(self, container: _WarmContainer) -> None:
+        process = container.process
+        if process.returncode is not None:
+            return
+        # Closing stdin makes the bootstrap exit; --rm removes the container.
+        if process.stdin:
+            process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def _drain_warm_pool(self) -> None:
+        for task in list(self._warm_tasks):
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        pools = list(self._warm_pool.values())
+        self._warm_pool = {}
+        for pool in pools:
+            for container in pool:
+                await self._discard_warm_container(container)
+
+    async def close(self) -> None:
+        """Cancel the idle-shutdown timer and remove pre-started warm containers.
+
+        Called on bridge shutdown so no timer task or container outlives it.
+        """
+
+        await self._cancel_runtime_shutdown_timer()
+        await self._drain_warm_pool()
+
     async def ensure_shared_directory(self, path: Path) -> None:
         resolved = path.expanduser().resolve()
         resolved.mkdir(parents=True, exist_ok=True)
@@ -1741,16 +2587,28 @@ class RootlessContainerSandbox:
         if "podman" not in runtime_name:
             return text
 
-        filtered_lines: List[str] = []
-        for line in text.splitlines():
-            stripped = line.strip()
-            if stripped and any(
-                stripped.startswith(prefix) for prefix in _PODMAN_PULL_PREFIXES
-            ):
-                continue
-            filtered_lines.append(line)
+        is_pull_line = _PODMAN_PULL_RE.match
+        return "\n".join(
+            line for line in text.splitlines() if not is_pull_line(line)
+        ).strip("\n")
+
+
+# Successful PATH lookups keyed by (candidate, PATH); misses are not cached so a
+# runtime installed later is still picked up.
+_RUNTIME_WHICH_CACHE: Dict[Tuple[str, str], str] = {}
+
 
-        return "\n".join(filtered_lines).strip("\n")
+def _which_runtime(candidate: str) -> Optional[str]:
+    search_path = os.environ.get("PATH")
+    key = (candidate, search_path or "")
+    cached = _RUNTIME_WHICH_CACHE.get(key)
+    if cached is not None:
+        return cached
+    # Resolve against the same PATH value the cache entry is keyed on.
+    resolved = shutil.which(candidate, path=search_path)
+    if resolved:
+        _RUNTIME_WHICH_CACHE[key] = resolved
+    return resolved
 
 
 def detect_runtime(preferred: Optional[str] = None) -> Optional[str]:
@@ -1764,7 +2622,7 @@ def detect_runtime(preferred: Optional[str] = None) -> Optional[str]:
     candidates.extend(["podman", "docker"])
 
     for candidate in candidates:
-        if candidate and shutil.which(candidate):
+        if candidate and _which_runtime(candidate):
             return candidate
 
     return None
@@ -1780,15 +2638,19 @@ class SandboxInvocation:
         self.host_dir: Optional[Path] = None
         self.container_env: Dict[str, str] = {}
         self.volume_mounts: List[str] = []
-        self.server_metadata: List[Dict[str, object]] = []
+        self.server_metadata: List[Mapping[str, object]] = []
         self.allowed_servers: set[str] = set()
         self.discovered_servers: Dict[str, str] = {}
 
     async def __aenter__(self) -> "SandboxInvocation":
-        self.server_metadata = []
-        for server_name in self.active_servers:
-            metadata = await self.bridge.get_cached_server_metadata(server_name)
-            self.server_metadata.append(metadata)
+        self.server_metadata = list(
+            await asyncio.gather(
+                *(
+                    self.bridge.get_cached_server_metadata(server_name)
+                    for server_name in self.active_servers
+                )
+            )
+        )
         self.allowed_servers = {
             str(meta.get("name"))
             for meta in self.server_metadata
@@ -1813,6 +2675,8 @@ class SandboxInvocation:
         if ensure_share:
             await ensure_share(base_dir)
 
+        # A fresh directory per invocation: a timed-out container may outlive
+        # its client process and keep writing to /ipc, so it is never reused.
         self._temp_dir = tempfile.TemporaryDirectory(
             prefix="mcp-bridge-ipc-", dir=str(base_dir)
         )
@@ -1823,13 +2687,11 @@ class SandboxInvocation:
         self.volume_mounts.append(f"{host_dir}:/ipc:rw")
         self.volume_mounts.append(f"{user_tools_dir}:/projects:rw")
 
-        self.container_env["MCP_AVAILABLE_SERVERS"] = json.dumps(
-            self.server_metadata,
-            separators=(",", ":"),
+        self.container_env["MCP_AVAILABLE_SERVERS"] = self.bridge._metadata_json(
+            self.active_servers, self.server_metadata
         )
-        self.container_env["MCP_DISCOVERED_SERVERS"] = json.dumps(
-            self.discovered_servers,
-            separators=(",", ":"),
+        self.container_env["MCP_DISCOVERED_SERVERS"] = self.bridge._discovered_json(
+            self.discovered_servers
         )
         return self
 
@@ -1890,12 +2752,50 @@ class SandboxInvocation:
                 return {"success": False, "error": str(exc)}
             return {"success": True, "results": results}
 
+        if req_type == "batch_call":
+            return await self._handle_batch_call(request)
+
         if req_type not in {"list_tools", "call_tool"}:
             return {
                 "success": False,
                 "error": f"Unknown RPC type: {req_type}",
             }
 
+        return await self._handle_server_rpc(req_type, request)
+
+    async def _handle_batch_call(self, request: Dict[str, object]) -> Dict[str, object]:
+        calls = request.get("calls")
+        if not isinstance(calls, list):
+            return {"success": False, "error": "'calls' must be a list"}
+        max_concurrent = request.get("maxConcurrent", 8)
+        if not isinstance(max_concurrent, int):
+            return {"success": False, "error": "'maxConcurrent' must be an integer"}
+        stop_on_error = bool(request.get("stopOnError", False))
+        slots = asyncio.Semaphore(max(1, min(_MAX_CONCURRENT_RPCS, max_concurrent)))
+        failed = False
+
+        async def _dispatch(call: object) -> Dict[str, object]:
+            nonlocal failed
+            async with slots:
+                if stop_on_error and failed:
+                    return {"success": False, "error": "Skipped after earlier failure"}
+                if not isinstance(call, dict):
+                    outcome: Dict[str, object] = {
+                        "success": False,
+                        "error": "Each call must be an object",
+                    }
+                else:
+                    outcome = await self._handle_server_rpc("call_tool", call)
+                if not outcome.get("success", True):
+                    failed = True
+                return outcome
+
+        results = await asyncio.gather(*(_dispatch(call) for call in calls))
+        return {"success": True, "results": list(results)}
+
+    async def _handle_server_rpc(
+        self, req_type: object, request: Dict[str, object]
+    ) -> Dict[str, object]:
         server = request.get("server")
         if not isinstance(server, str) or server not in self.allowed_servers:
             return {
@@ -1941,11 +2841,25 @@ class MCPBridge:
         self.clients: Dict[str, object] = {}
         self.loaded_servers: set[str] = set()
         self._aliases: Dict[str, str] = {}
+        # Mirrors ``self._aliases.values()`` for O(1) collision checks
+        self._used_aliases: set[str] = set()
         self._discovered = False
-        self._server_metadata_cache: Dict[str, Dict[str, object]] = {}
+        # Frozen with _freeze_jsonish; safe to share without copying.
+        self._server_metadata_cache: Dict[str, Mapping[str, object]] = {}
         self._server_docs_cache: Dict[str, Dict[str, object]] = {}
-        self._search_index: List[Dict[str, object]] = []
-        self._search_index_dirty = False
+        # Formatted get_tool_docs results per server, keyed by (tool, detail)
+        self._tool_docs_cache: Dict[
+            str, Dict[Tuple[Optional[str], str], List[Dict[str, object]]]
+        ] = {}
+        # One lock per server so concurrent callers share a single list_tools
+        self._metadata_locks: Dict[str, asyncio.Lock] = {}
+        # Serialised sandbox metadata, keyed by the ordered server selection.
+        self._metadata_json_cache: Dict[Tuple[str, ...], str] = {}
+        self._discovered_json_cache: Optional[
+            Tuple[Tuple[Tuple[str, str], ...], str]
+        ] = None
+        # Per-server search index, kept in step with the docs cache
+        self._search_shards: Dict[str, _SearchShard] = {}
 
     async def discover_servers(self) -> Dict[str, str]:
         """
@@ -1954,54 +2868,60 @@ class MCPBridge:
         """
         discovered: Dict[str, str] = {}
 
-        # 1. Scan all configured sources
+        # 1. Scan all configured sources; files are parsed concurrently but
+        # merged in source order so the first definition of a name still wins.
+        existing_paths = _existing_source_paths(CONFIG_SOURCES)
+        pending: List[Tuple[ConfigSource, Path, str]] = []
         for source in CONFIG_SOURCES:
-            if not source.path.exists():
+            if source.path not in existing_paths:
                 continue
 
             try:
                 if source.type == "directory":
                     for config_file in source.path.glob(f"*.{source.format}"):
-                        server_configs = self._load_server_config(
-                            config_file,
-                            source_name=f"{source.name} ({config_file.name})",
+                        pending.append(
+                            (
+                                source,
+                                config_file,
+                                f"{source.name} ({config_file.name})",
+                            )
                         )
-                        for name, (config, description) in server_configs.items():
-                            if name not in self.servers:
-                                info = self._parse_server_config(
-                                    name, config, description
-                                )
-                                if info:
-                                    self.servers[name] = info
-                                    discovered[name] = description
-                                    logger.info(
-                                        "Found MCP server %s in %s (%s)",
-                                        name,
-                                        config_file,
-                                        source.name,
-                                    )
                 elif source.type == "file":
-                    server_configs = self._load_server_config(
-                        source.path, source_name=source.name
-                    )
-                    for name, (config, description) in server_configs.items():
-                        if name not in self.servers:
-                            info = self._parse_server_config(name, config, description)
-                            if info:
-                                self.servers[name] = info
-                                discovered[name] = description
-                                logger.info(
-                                    "Found MCP server %s in %s (%s)",
-                                    name,
-                                    source.path,
-                                    source.name,
-                                )
+                    pending.append((source, source.path, source.name))
             except Exception as e:
                 logger.warning(
                     f"Failed to scan source {source.name} ({source.path}): {e}",
                     exc_info=True,
                 )
 
+        loaded = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._load_server_config, path, source_name=label)
+                for _source, path, label in pending
+            ),
+            return_exceptions=True,
+        )
+        for (source, path, _label), server_configs in zip(pending, loaded):
+            if isinstance(server_configs, BaseException):
+                logger.warning(
+                    f"Failed to scan source {source.name} ({source.path}): "
+                    f"{server_configs}",
+                    exc_info=server_configs,
+                )
+                continue
+            for name, (config, description) in server_configs.items():
+                if name not in self.servers:
+                    info = self._parse_server_config(name, config, description)
+                    if info:
+                        self.servers[name] = info
+                        discovered[name] = description
+                        logger.info(
+                            "Found MCP server %s in %s (%s)",
+                            name,
+                            path,
+                            source.name,
+                        )
+
         # 2. Load from environment variable (highest priority for overrides if we implemented that)
         env_config_path = os.environ.get("MCP_SERVERS_CONFIG")
         if env_config_path:
@@ -2091,7 +3011,8 @@ class MCPBridge:
         if isinstance(cwd_raw, (str, Path)):
             cwd_str = str(cwd_raw)
         return MCPServerInfo(
-            name=name,
+            # Server names key bridge.servers, clients and the allow-list
+            name=sys.intern(name),
             command=command,
             args=str_args,
             env=str_env,
@@ -2106,70 +3027,126 @@ class MCPBridge:
         if not info:
             raise SandboxError(f"Unknown MCP server: {server_name}")
 
-        # Validate cwd if provided - warn, but do not fail startup
-        if info.cwd:
-            try:
-                path = Path(info.cwd)
-                if not path.exists():
-                    logger.warning(
-                        "Configured cwd for MCP server %s does not exist: %s",
-                        server_name,
-                        info.cwd,
-                    )
-            except Exception:
-                logger.debug(
-                    "Failed to check cwd for server %s: %s",
-                    server_name,
-                    info.cwd,
-                    exc_info=True,
-                )
+        # Validate cwd if provided - warn, but do not fail startup. The stat
+        # runs in a worker thread while the client starts.
+        cwd_check = (
+            asyncio.create_task(
+                asyncio.to_thread(_warn_if_cwd_missing, server_name, info.cwd_path)
+            )
+            if info.cwd_path is not None
+            else None
+        )
 
         client = PersistentMCPClient(info)
-        await client.start()
+        try:
+            await client.start()
+        finally:
+            if cwd_check is not None:
+                await cwd_check
+        # Interned so later lookups by configured names compare by identity
+        server_name = sys.intern(server_name)
         self.clients[server_name] = client
         self.loaded_servers.add(server_name)
         logger.info("Loaded MCP server %s", server_name)
         self._server_metadata_cache.pop(server_name, None)
         self._server_docs_cache.pop(server_name, None)
-        self._search_index_dirty = True
+        self._tool_docs_cache.pop(server_name, None)
+        self._search_shards.pop(server_name, None)
+        self._metadata_json_cache.clear()
+
+    async def _load_servers(self, server_names: Sequence[str]) -> None:
+        """Start several MCP servers concurrently.
+
+        Every server gets a chance to start even if another one fails; the
+        first failure is re-raised once all start attempts have settled.
+        """
+
+        results = await asyncio.gather(
+            *(self.load_server(name) for name in server_names),
+            return_exceptions=True,
+        )
+        errors: List[BaseException] = []
+        for name, outcome in zip(server_names, results):
+            if isinstance(outcome, BaseException):
+                logger.debug("Failed to load MCP server %s", name, exc_info=outcome)
+                errors.append(outcome)
+        if errors:
+            raise errors[0]
+
+    async def shutdown(self) -> None:
+        """Stop every loaded MCP client concurrently, then close the sandbox."""
+
+        clients = list(self.clients.items())
+        self.clients.clear()
+        self.loaded_servers.clear()
+        self._server_metadata_cache.clear()
+        self._server_docs_cache.clear()
+        self._tool_docs_cache.clear()
+        self._metadata_locks.clear()
+        self._metadata_json_cache.clear()
+        self._search_shards.clear()
+
+        async def _stop(name: str, client: object) -> None:
+            try:
+                await cast(ClientLike, client).stop()
+            except Exception:
+                logger.warning("Failed to stop MCP server %s", name, exc_info=True)
+
+        async with asyncio.TaskGroup() as group:
+            for name, client in clients:
+                group.create_task(_stop(name, client))
+
+        close_sandbox = getattr(self.sandbox, "close", None)
+        if close_sandbox:
+            await close_sandbox()
 
     def _alias_for(self, name: str) -> str:
         if name in self._aliases:
             return self._aliases[name]
-        base = re.sub(r"[^a-z0-9_]+", "_", name.lower()) or "server"
+        base = _ALIAS_RE.sub("_", name.lower()) or "server"
         if base[0].isdigit():
             base = f"_{base}"
         alias = base
         suffix = 1
-        used = set(self._aliases.values())
+        used = self._used_aliases
         while alias in used:
             suffix += 1
             alias = f"{base}_{suffix}"
         self._aliases[name] = alias
+        used.add(alias)
         return alias
 
     async def _ensure_server_metadata(self, server_name: str) -> None:
         if server_name in self._server_metadata_cache:
             return
 
+        lock = self._metadata_locks.setdefault(server_name, asyncio.Lock())
+        async with lock:
+            if server_name not in self._server_metadata_cache:
+                await self._fetch_server_metadata(server_name)
+
+    async def _fetch_server_metadata(self, server_name: str) -> None:
         client = self.clients.get(server_name)
         if not client:
             raise SandboxError(f"Server {server_name} is not loaded")
 
+        # Claim the alias before awaiting so concurrent fetches stay deterministic
+        alias = self._alias_for(server_name)
         client_obj = cast(ClientLike, client)
         tool_specs = await client_obj.list_tools()
-        alias = self._alias_for(server_name)
         alias_counts: Dict[str, int] = {}
         tools: List[Dict[str, object]] = []
         doc_entries: List[Dict[str, object]] = []
         identifier_index: Dict[str, Dict[str, object]] = {}
 
         for spec in tool_specs:
-            raw_name = str(spec.get("name") or "tool")
+            raw_name = sys.intern(str(spec.get("name") or "tool"))
             base_alias = _sanitize_identifier(raw_name, default="tool")
             alias_counts[base_alias] = alias_counts.get(base_alias, 0) + 1
             count = alias_counts[base_alias]
-            tool_alias = base_alias if count == 1 else f"{base_alias}_{count}"
+            tool_alias = sys.intern(
+                base_alias if count == 1 else f"{base_alias}_{count}"
+            )
 
             input_schema = spec.get("input_schema") or spec.get("inputSchema")
             description = str(spec.get("description") or "").strip()
@@ -2182,18 +3159,13 @@ class MCPBridge:
             }
             tools.append(tool_payload)
 
-            keywords = " ".join(
-                filter(
-                    None,
-                    {
-                        server_name,
-                        alias,
-                        raw_name,
-                        tool_alias,
-                        description,
-                    },
-                )
-            ).lower()
+            # Ordered and de-duplicated so the index is stable across runs
+            keyword_parts: List[str] = []
+            for part in (server_name, alias, raw_name, tool_alias, description):
+                lowered = part.lower()
+                if lowered and lowered not in keyword_parts:
+                    keyword_parts.append(lowered)
+            keywords = " ".join(keyword_parts)
 
             doc_entry = {
                 "name": raw_name,
@@ -2201,17 +3173,16 @@ class MCPBridge:
                 "description": description,
                 "input_schema": input_schema,
                 "keywords": keywords,
+                "keyword_tokens": frozenset(keyword_parts).union(
+                    _KEYWORD_SPLIT_RE.split(keywords)
+                ),
             }
             doc_entries.append(doc_entry)
             identifier_index[tool_alias.lower()] = doc_entry
             identifier_index[raw_name.lower()] = doc_entry
 
         server_obj = self.servers.get(server_name)
-        cwd_value = (
-            str(server_obj.cwd)
-            if server_obj and getattr(server_obj, "cwd", None)
-            else None
-        )
+        cwd_value = server_obj.cwd_str if server_obj else None
         metadata = {
             "name": server_name,
             "alias": alias,
@@ -2219,7 +3190,9 @@ class MCPBridge:
             "cwd": cwd_value,
         }
 
-        self._server_metadata_cache[server_name] = cast(Dict[str, object], metadata)
+        self._server_metadata_cache[server_name] = _freeze_jsonish(metadata)
+        self._metadata_json_cache.clear()
+        self._tool_docs_cache.pop(server_name, None)
         self._server_docs_cache[server_name] = cast(
             Dict[str, object],
             {
@@ -2229,11 +3202,37 @@ class MCPBridge:
                 "identifier_index": identifier_index,
             },
         )
-        self._search_index_dirty = True
+        self._search_shards[server_name] = _SearchShard.build(
+            server_name, alias, doc_entries
+        )
+
+    async def get_cached_server_metadata(
+        self, server_name: str
+    ) -> Mapping[str, object]:
+        """Return the server's metadata as a read-only mapping (tools as a tuple)."""
 
-    async def get_cached_server_metadata(self, server_name: str) -> Dict[str, object]:
         await self._ensure_server_metadata(server_name)
-        return copy.deepcopy(self._server_metadata_cache[server_name])
+        return self._server_metadata_cache[server_name]
+
+    def _metadata_json(
+        self, server_names: Sequence[str], metadata: Sequence[Mapping[str, object]]
+    ) -> str:
+        key = tuple(server_names)
+        cached = self._metadata_json_cache.get(key)
+        if cached is None:
+            cached = _dumps_compact(metadata)
+            self._metadata_json_cache[key] = cached
+        return cached
+
+    def _discovered_json(self, discovered: Dict[str, str]) -> str:
+        # self.servers may be replaced wholesale, so key on the content itself;
+        # the tuple is far cheaper to build than the JSON document.
+        key = tuple(discovered.items())
+        cached = self._discovered_json_cache
+        if cached is None or cached[0] != key:
+            cached = (key, _dumps_compact(discovered))
+            self._discovered_json_cache = cached
+        return cached[1]
 
     @staticmethod
     def _normalise_detail(value: object) -> str:
@@ -2241,24 +3240,64 @@ class MCPBridge:
         return detail if detail in {"summary", "full"} else "summary"
 
     @staticmethod
-    def _format_tool_doc(
+    def _format_tool_doc_summary(
         server_name: str,
         server_alias: str,
         info: Dict[str, object],
-        detail: str,
     ) -> Dict[str, object]:
-        doc: Dict[str, object] = {
+        # Doc entries always carry these keys (see _ensure_server_metadata)
+        description = info["description"]
+        if description:
+            return {
+                "server": server_name,
+                "serverAlias": server_alias,
+                "tool": info["name"],
+                "toolAlias": info["alias"],
+                "description": description,
+            }
+        return {
             "server": server_name,
             "serverAlias": server_alias,
-            "tool": info.get("name"),
-            "toolAlias": info.get("alias"),
+            "tool": info["name"],
+            "toolAlias": info["alias"],
         }
-        description = info.get("description")
+
+    @staticmethod
+    def _format_tool_doc_full(
+        server_name: str,
+        server_alias: str,
+        info: Dict[str, object],
+    ) -> Dict[str, object]:
+        input_schema = info["input_schema"]
+        if input_schema is None:
+            return MCPBridge._format_tool_doc_summary(server_name, server_alias, info)
+        description = info["description"]
         if description:
-            doc["description"] = description
-        if detail == "full" and info.get("input_schema") is not None:
-            doc["inputSchema"] = info.get("input_schema")
-        return doc
+            return {
+                "server": server_name,
+                "serverAlias": server_alias,
+                "tool": info["name"],
+                "toolAlias": info["alias"],
+                "description": description,
+                "inputSchema": input_schema,
+            }
+        return {
+            "server": server_name,
+            "serverAlias": server_alias,
+            "tool": info["name"],
+            "toolAlias": info["alias"],
+            "inputSchema": input_schema,
+        }
+
+    @classmethod
+    def _tool_doc_formatter(
+        cls, detail: object
+    ) -> Callable[[str, str, Dict[str, object]], Dict[str, object]]:
+        """Pick the doc builder for ``detail`` once, outside per-tool loops."""
+
+        if cls._normalise_detail(detail) == "full":
+            return cls._format_tool_doc_full
+        return cls._format_tool_doc_summary
 
     async def get_tool_docs(
         self,
@@ -2272,13 +3311,22 @@ class MCPBridge:
         if not cache_entry:
             raise SandboxError(f"Documentation unavailable for server {server_name}")
 
-        detail_value = self._normalise_detail(detail)
+        if tool is not None and not isinstance(tool, str):
+            raise SandboxError("'tool' must be a string when provided")
+        formatted = self._tool_docs_cache.setdefault(server_name, {})
+        key = (
+            tool.lower() if tool is not None else None,
+            self._normalise_detail(detail),
+        )
+        cached = formatted.get(key)
+        if cached is not None:
+            return list(cached)
+
+        format_doc = self._tool_doc_formatter(detail)
         server_alias = str(cache_entry.get("alias", ""))
         docs: List[Dict[str, object]] = []
 
         if tool is not None:
-            if not isinstance(tool, str):
-                raise SandboxError("'tool' must be a string when provided")
             identifier_map_raw = cache_entry.get("identifier_index", {})
             identifier_map: Dict[str, Dict[str, object]] = {}
             if isinstance(identifier_map_raw, dict):
@@ -2287,48 +3335,19 @@ class MCPBridge:
             if not match:
                 raise SandboxError(f"Tool {tool!r} not found for server {server_name}")
             docs.append(
-                self._format_tool_doc(
-                    server_name,
-                    server_alias,
-                    cast(Dict[str, object], match),
-                    detail_value,
-                )
+                format_doc(server_name, server_alias, cast(Dict[str, object], match))
             )
-            return docs
+            formatted[key] = docs
+            return list(docs)
 
         tools_raw = cache_entry.get("tools", [])
         if not isinstance(tools_raw, (list, tuple)):
             tools_raw = []
         for info_raw in tools_raw:
             info = cast(Dict[str, object], info_raw)
-            docs.append(
-                self._format_tool_doc(server_name, server_alias, info, detail_value)
-            )
-        return docs
-
-    def _ensure_search_index(self) -> None:
-        if not self._search_index_dirty:
-            return
-
-        entries: List[Dict[str, object]] = []
-        for server_name, cache_entry in self._server_docs_cache.items():
-            server_alias = str(cache_entry.get("alias", ""))
-            tools_raw = cache_entry.get("tools", [])
-            if not isinstance(tools_raw, (list, tuple)):
-                continue
-            for info_raw in tools_raw:
-                info = cast(Dict[str, object], info_raw)
-                entries.append(
-                    {
-                        "server": server_name,
-                        "server_alias": server_alias,
-                        "info": info,
-                        "keywords": str(info.get("keywords", "")),
-                    }
-                )
-
-        self._search_index = entries
-        self._search_index_dirty = False
+            docs.append(format_doc(server_name, server_alias, info))
+        formatted[key] = docs
+        return list(docs)
 
     async def search_tool_docs(
         self,
@@ -2341,36 +3360,44 @@ class MCPBridge:
         if not query.strip():
             return []
 
-        for server_name in allowed_servers:
-            await self._ensure_server_metadata(server_name)
+        await asyncio.gather(
+            *(
+                self._ensure_server_metadata(server_name)
+                for server_name in dict.fromkeys(allowed_servers)
+            )
+        )
 
-        self._ensure_search_index()
-        tokens = [token for token in query.lower().split() if token]
+        tokens = query.lower().split()
         if not tokens:
             return []
 
-        detail_value = self._normalise_detail(detail)
-        allowed = set(allowed_servers)
+        format_doc = self._tool_doc_formatter(detail)
+        capped = max(1, min(20, limit))
+        token_set = frozenset(tokens)
+        trigrams = frozenset().union(*map(_trigrams, token_set))
         matches: List[Dict[str, object]] = []
 
-        for entry in self._search_index:
-            if entry.get("server") not in allowed:
+        allowed = set(allowed_servers)
+        # Shards iterate in docs-cache order, so results keep a stable order
+        for server_name, shard in self._search_shards.items():
+            if server_name not in allowed:
                 continue
-            keywords = str(entry.get("keywords", ""))
-            if all(token in keywords for token in tokens):
-                info_raw = entry.get("info", {})
-                info = cast(Dict[str, object], info_raw)
+            entries = shard.entries
+            for index in shard.candidates(trigrams):
+                entry = entries[index]
+                # Whole-word hits are accepted by set lookup; the substring
+                # scan only runs for partial-word queries and misses.
+                if not token_set <= entry.tokens:
+                    haystack = entry.haystack
+                    if not all(token in haystack for token in token_set):
+                        continue
                 matches.append(
-                    self._format_tool_doc(
-                        str(entry.get("server")),
-                        str(entry.get("server_alias", "")),
-                        info,
-                        detail_value,
-                    )
+                    format_doc(entry.server, entry.server_alias, entry.info)
                 )
+                if len(matches) >= capped:
+                    return matches
 
-        capped = max(1, min(20, limit))
-        return matches[:capped]
+        return matches
 
     async def execute_code(
         self,
@@ -2378,12 +3405,34 @@ class MCPBridge:
         servers: Optional[Sequence[str]] = None,
         timeout: int = DEFAULT_TIMEOUT,
     ) -> SandboxResult:
-        await self.discover_servers()
         request_timeout = max(1, min(MAX_TIMEOUT, timeout))
-        requested_servers = list(dict.fromkeys(servers or []))
-
-        for server_name in requested_servers:
-            await self.load_server(server_name)
+        requested_servers: List[str] = []
+        if servers:
+            seen: set[str] = set()
+            for server_name in servers:
+                if server_name not in seen:
+                    seen.add(server_name)
+                    requested_servers.append(server_name)
+
+        # Rediscovery never replaces a known definition, so servers that are
+        # already configured start loading while the sources are rescanned.
+        known = [name for name in requested_servers if name in self.servers]
+        if known:
+            # Both settle before any failure is raised, so discovery never
+            # keeps mutating self.servers behind a failed call.
+            outcomes = await asyncio.gather(
+                self.discover_servers(),
+                self._load_servers(known),
+                return_exceptions=True,
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+        else:
+            await self.discover_servers()
+        pending = [name for name in requested_servers if name not in known]
+        if pending:
+            await self._load_servers(pending)
 
         async with SandboxInvocation(self, requested_servers) as invocation:
             sandbox_obj = cast(SandboxLike, self.sandbox)
@@ -2445,44 +3494,46 @@ except Exception:
     pass
 
 
+# Constant tool listing, built once instead of on every client handshake
+_RUN_PYTHON_TOOL = Tool(
+    name="run_python",
+    description=(
+        "Execute Python code inside a rootless container sandbox. "
+        "Use the optional 'servers' array to load MCP servers for this execution."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "code": {
+                "type": "string",
+                "description": (
+                    "Python source code to execute. Call runtime.capability_summary() inside the sandbox for this digest. "
+                    f"{SANDBOX_HELPERS_SUMMARY}"
+                ),
+            },
+            "servers": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": (
+                    "Optional list of MCP servers to make available as mcp_<name> proxies"
+                ),
+            },
+            "timeout": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": MAX_TIMEOUT,
+                "default": DEFAULT_TIMEOUT,
+                "description": "Execution timeout in seconds",
+            },
+        },
+        "required": ["code"],
+    },
+)
+
+
 @app.list_tools()
 async def list_tools() -> List[Tool]:
-    return [
-        Tool(
-            name="run_python",
-            description=(
-                "Execute Python code inside a rootless container sandbox. "
-                "Use the optional 'servers' array to load MCP servers for this execution."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "code": {
-                        "type": "string",
-                        "description": (
-                            "Python source code to execute. Call runtime.capability_summary() inside the sandbox for this digest. "
-                            f"{SANDBOX_HELPERS_SUMMARY}"
-                        ),
-                    },
-                    "servers": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": (
-                            "Optional list of MCP servers to make available as mcp_<name> proxies"
-                        ),
-                    },
-                    "timeout": {
-                        "type": "integer",
-                        "minimum": 1,
-                        "maximum": MAX_TIMEOUT,
-                        "default": DEFAULT_TIMEOUT,
-                        "description": "Execution timeout in seconds",
-                    },
-                },
-                "required": ["code"],
-            },
-        )
-    ]
+    return [_RUN_PYTHON_TOOL]
 
 
 @app.list_resources()
@@ -2503,6 +3554,42 @@ async def read_resource(uri: str) -> str:
     return _CAPABILITY_RESOURCE_TEXT
 
 
+def _parse_run_python_args(
+    arguments: Dict[str, object],
+) -> Tuple[str, List[str], int]:
+    """Validate ``run_python`` arguments into ``(code, servers, timeout)``.
+
+    Exact ``type()`` checks are used on purpose: ``bool`` is not accepted as
+    a timeout and non-string server names are rejected rather than coerced.
+    """
+
+    code = arguments.get("code")
+    if type(code) is not str or not code.strip():
+        raise _ArgumentValidationError("Missing 'code' argument")
+
+    servers = arguments.get("servers", [])
+    if type(servers) is not list or not all(
+        type(server) is str for server in servers
+    ):
+        raise _ArgumentValidationError("'servers' must be a list of strings")
+
+    timeout_value = arguments.get("timeout", DEFAULT_TIMEOUT)
+    if type(timeout_value) is not int:
+        raise _ArgumentValidationError("'timeout' must be an integer")
+
+    return code, cast(List[str], servers), max(1, min(MAX_TIMEOUT, timeout_value))
+
+
+def _validation_error_response(exc: _ArgumentValidationError) -> CallToolResult:
+    """Render a rejected ``run_python`` call; runs before anything is awaited."""
+
+    return _build_tool_response(
+        status="validation_error",
+        summary=str(exc),
+        error=str(exc),
+    )
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: Dict[str, object]) -> CallToolResult:
     if name != "run_python":
@@ -2512,31 +3599,10 @@ async def call_tool(name: str, arguments: Dict[str, object]) -> CallToolResult:
             error=f"Unknown tool: {name}",
         )
 
-    code = arguments.get("code")
-    if not isinstance(code, str) or not code.strip():
-        return _build_tool_response(
-            status="validation_error",
-            summary="Missing 'code' argument",
-            error="Missing 'code' argument",
-        )
-
-    servers = arguments.get("servers", [])
-    if not isinstance(servers, list):
-        return _build_tool_response(
-            status="validation_error",
-            summary="'servers' must be a list",
-            error="'servers' must be a list",
-        )
-    server_list = [str(server) for server in servers]
-
-    timeout_value = arguments.get("timeout", DEFAULT_TIMEOUT)
-    if not isinstance(timeout_value, int):
-        return _build_tool_response(
-            status="validation_error",
-            summary="'timeout' must be an integer",
-            error="'timeout' must be an integer",
-        )
-    timeout_value = max(1, min(MAX_TIMEOUT, timeout_value))
+    try:
+        code, server_list, timeout_value = _parse_run_python_args(arguments)
+    except _ArgumentValidationError as exc:
+        return _validation_error_response(exc)
 
     try:
         result = await bridge.execute_code(code, server_list, timeout_value)
@@ -2591,10 +3657,26 @@ async def main() -> None:
     except Exception:
         logging.exception("Fatal error in main loop")
         raise
+    finally:
+        await bridge.shutdown()
+
+
+def _event_loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """Return uvloop's loop constructor when available, else the asyncio default."""
+
+    if _uvloop is None:
+        return None
+    return _uvloop.new_event_loop
+
+
+def run() -> None:
+    """Run the bridge until its stdio transport closes."""
+
+    asyncio.run(main(), loop_factory=_event_loop_factory())
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run()
     except KeyboardInterrupt:
         sys.exit(0)
@@ -11,23 +11,24 @@ from mcp.types import CallToolResult, TextContent, Tool
 app = Server("stub-mcp")
 
 
+_ECHO_TOOL = Tool(
+    name="echo",
+    description="Echo the provided message",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "message": {
+                "type": "string",
+            }
+        },
+        "required": ["message"],
+    },
+)
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
-    return [
-        Tool(
-            name="echo",
-            description="Echo the provided message",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "message": {
-                        "type": "string",
-                    }
-                },
-                "required": ["message"],
-            },
-        )
-    ]
+    return [_ECHO_TOOL]
 
 
 @app.call_tool()
@@ -116,3 +116,44 @@ def test_discover_servers_precedence(mock_bridge, tmp_path):
 
         # Verify new server WAS added
         assert "new-server" in mock_bridge.servers
+
+
+def test_existing_source_paths_skips_missing_entries(tmp_path):
+    """Only sources present on disk are reported, including missing parents."""
+    from mcp_server_code_execution_mode import ConfigSource, _existing_source_paths
+
+    present = tmp_path / "mcp.json"
+    present.write_text("{}")
+    sources = [
+        ConfigSource(present, "file", name="Present"),
+        ConfigSource(tmp_path / "absent.json", "file", name="Absent"),
+        ConfigSource(tmp_path / "missing" / "mcp.json", "file", name="No Parent"),
+    ]
+
+    assert _existing_source_paths(sources) == {present}
+
+
+def test_discover_servers_merges_sources_in_order(mock_bridge, tmp_path):
+    """Configs are parsed concurrently but earlier sources still win."""
+    from mcp_server_code_execution_mode import ConfigSource
+
+    first = tmp_path / "first.json"
+    first.write_text(
+        json.dumps({"mcpServers": {"dup": {"command": "first"}, "a": {"command": "a"}}})
+    )
+    second = tmp_path / "second.json"
+    second.write_text(
+        json.dumps({"mcpServers": {"dup": {"command": "second"}, "b": {"command": "b"}}})
+    )
+    mock_sources = [
+        ConfigSource(first, "file", name="First"),
+        ConfigSource(second, "file", name="Second"),
+    ]
+
+    with patch("mcp_server_code_execution_mode.CONFIG_SOURCES", mock_sources):
+        import asyncio
+
+        asyncio.run(mock_bridge.discover_servers())
+
+    assert mock_bridge.servers["dup"].command == "first"
+    assert {"a", "b"} <= set(mock_bridge.servers)
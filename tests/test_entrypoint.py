@@ -130,65 +130,80 @@ def _run_entrypoint(
 
     class _StdoutCapture:
         def __init__(self) -> None:
-            self._buffer = ""
+            # Partial-line chunks; joined only once a newline arrives
+            self._pending: list[str] = []
 
         def write(self, data: str) -> None:
-            self._buffer += data
-            while "\n" in self._buffer:
-                line, self._buffer = self._buffer.split("\n", 1)
-                if not line:
-                    continue
-                message = json.loads(line)
-                calls.append(message)
-                msg_type = message.get("type")
-                if msg_type == "stdout":
-                    stdout_chunks.append(str(message.get("data", "")))
-                elif msg_type == "stderr":
-                    stderr_chunks.append(str(message.get("data", "")))
-                elif msg_type == "rpc_request":
-                    payload = message.get("payload", {})
-                    rpc_payloads.append(payload)
-                    req_type = payload.get("type")
-                    message_id = message.get("id")
-                    server_info = metadata_list[0]
-                    if req_type == "call_tool":
-                        _send_response(message_id, {"success": True, "result": ["ok"]})
-                    elif req_type == "list_tools":
-                        _send_response(
-                            message_id, {"success": True, "tools": server_info["tools"]}
+            if "\n" not in data:
+                self._pending.append(data)
+                return
+            combined = "".join(self._pending) + data
+            self._pending.clear()
+            *lines, tail = combined.split("\n")
+            if tail:
+                self._pending.append(tail)
+            for line in lines:
+                if line:
+                    self._handle_line(line)
+
+        def _handle_line(self, line: str) -> None:
+            message = json.loads(line)
+            calls.append(message)
+            msg_type = message.get("type")
+            if msg_type == "stdout":
+                stdout_chunks.append(str(message.get("data", "")))
+            elif msg_type == "stderr":
+                stderr_chunks.append(str(message.get("data", "")))
+            elif msg_type == "rpc_request":
+                payload = message.get("payload", {})
+                rpc_payloads.append(payload)
+                req_type = payload.get("type")
+                message_id = message.get("id")
+                server_info = metadata_list[0]
+                if req_type == "call_tool":
+                    _send_response(message_id, {"success": True, "result": ["ok"]})
+                elif req_type == "list_tools":
+                    _send_response(
+                        message_id, {"success": True, "tools": server_info["tools"]}
+                    )
+                elif req_type == "list_servers":
+                    _send_response(
+                        message_id,
+                        {"success": True, "servers": [server_info["name"]]},
+                    )
+                elif req_type == "query_tool_docs":
+                    detail = str(payload.get("detail", "summary")).lower()
+                    if "tool" in payload and payload.get("tool") is not None:
+                        selected = _select_tool_metadata(
+                            server_info, str(payload.get("tool"))
                         )
-                    elif req_type == "list_servers":
-                        _send_response(
-                            message_id,
-                            {"success": True, "servers": [server_info["name"]]},
-                        )
-                    elif req_type == "query_tool_docs":
-                        detail = str(payload.get("detail", "summary")).lower()
-                        if "tool" in payload and payload.get("tool") is not None:
-                            selected = _select_tool_metadata(
-                                server_info, str(payload.get("tool"))
-                            )
-                            docs = [_format_doc(server_info, selected, detail)]
-                        else:
-                            docs = [
-                                _format_doc(server_info, spec, detail)
-                                for spec in server_info["tools"]
-                            ]
-                        _send_response(message_id, {"success": True, "docs": docs})
-                    elif req_type == "search_tool_docs":
-                        detail = str(payload.get("detail", "summary")).lower()
-                        limit = payload.get("limit")
-                        tools = [
+                        docs = [_format_doc(server_info, selected, detail)]
+                    else:
+                        docs = [
                             _format_doc(server_info, spec, detail)
                             for spec in server_info["tools"]
                         ]
-                        if isinstance(limit, int) and limit > 0:
-                            tools = tools[:limit]
-                        _send_response(message_id, {"success": True, "results": tools})
-                    else:
-                        raise AssertionError(f"Unexpected RPC payload: {payload}")
+                    _send_response(message_id, {"success": True, "docs": docs})
+                elif req_type == "search_tool_docs":
+                    detail = str(payload.get("detail", "summary")).lower()
+                    limit = payload.get("limit")
+                    tools = [
+                        _format_doc(server_info, spec, detail)
+                        for spec in server_info["tools"]
+                    ]
+                    if isinstance(limit, int) and limit > 0:
+                        tools = tools[:limit]
+                    _send_response(message_id, {"success": True, "results": tools})
+                elif req_type == "batch_call":
+                    results = [
+                        {"success": True, "result": [call["tool"], call["arguments"]]}
+                        for call in payload.get("calls", [])
+                    ]
+                    _send_response(message_id, {"success": True, "results": results})
                 else:
-                    raise AssertionError(f"Unexpected message type: {message}")
+                    raise AssertionError(f"Unexpected RPC payload: {payload}")
+            else:
+                raise AssertionError(f"Unexpected message type: {message}")
 
         def flush(self) -> None:  # pragma: no cover - compatibility shim
             return None
@@ -240,6 +255,10 @@ class EntryPointGenerationTests(unittest.TestCase):
             "import mcp.servers.demo_server as demo\n"
             "result = await demo.list_things()\n"
             "assert result == ['ok']\n"
+            "assert await demo.list_things(server_name='x') == ['ok']\n"
+            "assert demo.list_things.__name__ == 'list_things'\n"
+            "proxy = mcp_servers['demo-server']\n"
+            "assert proxy.list_things is proxy.list_things\n"
             "assert 'demo-server' in mcp_servers\n"
             "assert 'demo_server' in mcp.servers.__all__\n"
         )
@@ -271,6 +290,28 @@ class EntryPointGenerationTests(unittest.TestCase):
         if runtime_module is not None and mcp_package is not None:
             self.assertIs(getattr(mcp_package, "runtime", None), runtime_module)
 
+    def test_proxy_call_batch_sends_one_rpc(self) -> None:
+        user_code = (
+            "proxy = mcp_servers['demo-server']\n"
+            "results = await proxy.call_batch(\n"
+            "    [('list_things', {'a': 1}), ('raw_name', None)], max_concurrent=2\n"
+            ")\n"
+            "assert results == [\n"
+            "    {'success': True, 'result': ['list_things', {'a': 1}]},\n"
+            "    {'success': True, 'result': ['raw_name', {}]},\n"
+            "], results\n"
+        )
+
+        result = _run_entrypoint(user_code)
+
+        self.assertEqual(result["stderr"], "")
+        batches = [p for p in result["rpc_payloads"] if p.get("type") == "batch_call"]
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0]["maxConcurrent"], 2)
+        calls = batches[0]["calls"]
+        assert isinstance(calls, list)
+        self.assertEqual({call["server"] for call in calls}, {"demo-server"})
+
     def test_runtime_helpers_sync_and_async_behaviour(self) -> None:
         user_code = (
             "from mcp import runtime\n"
@@ -326,6 +367,46 @@ class EntryPointGenerationTests(unittest.TestCase):
         self.assertIn("search_tool_docs", rpc_types)
         self.assertIn("list_servers", rpc_types)
 
+    def test_stream_proxy_coalesces_partial_writes(self) -> None:
+        user_code = (
+            "print('alpha')\n"
+            "print('be', end='')\n"
+            "print('ta', end='')\n"
+        )
+
+        result = _run_entrypoint(user_code)
+
+        stdout_frames = [
+            call.get("data") for call in result["calls"] if call.get("type") == "stdout"
+        ]
+        self.assertEqual(stdout_frames, ["alpha\n", "beta"])
+        self.assertEqual(result["stdout"], "alpha\nbeta")
+
+    def test_stream_proxy_sends_stale_partial_line(self) -> None:
+        user_code = (
+            "import time\n"
+            "print('pending', end='')\n"
+            "time.sleep(0.3)\n"
+            "print(' done')\n"
+        )
+
+        result = _run_entrypoint(user_code)
+
+        stdout_frames = [
+            call.get("data") for call in result["calls"] if call.get("type") == "stdout"
+        ]
+        self.assertEqual(stdout_frames, ["pending", " done\n"])
+
+    def test_stream_proxy_sends_large_partial_line(self) -> None:
+        user_code = "print('x' * 5000, end='')\nprint('y')\n"
+
+        result = _run_entrypoint(user_code)
+
+        stdout_frames = [
+            call.get("data") for call in result["calls"] if call.get("type") == "stdout"
+        ]
+        self.assertEqual(stdout_frames, ["x" * 5000, "y\n"])
+
     def test_runtime_metadata_helpers_and_errors(self) -> None:
         user_code = (
             "from mcp import runtime\n"
@@ -1,15 +1,30 @@
+import ast
 import asyncio
-import json
+import inspect
 import logging
 import os
 import sys
 import tempfile
 import traceback
 import unittest
-from contextlib import asynccontextmanager, redirect_stderr, redirect_stdout
+from contextlib import ExitStack, asynccontextmanager, redirect_stderr, redirect_stdout
+from contextvars import ContextVar
+from functools import lru_cache, partial
 from io import StringIO
 from pathlib import Path
-from typing import Awaitable, Callable, ClassVar, Dict, List, Optional, Sequence, cast
+from types import CodeType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
 from unittest import mock
 
 import anyio
@@ -18,8 +33,138 @@ import mcp.types as mcp_types
 import mcp_server_code_execution_mode as bridge_module
 from mcp_server_code_execution_mode import SandboxError, SandboxResult, SandboxTimeout
 
+_STUB_PATH = Path(__file__).resolve().parent / "stub_mcp_server.py"
+
+# Config fixtures go through the bridge's serialiser (orjson when installed)
+_dumps_config = bridge_module._dumps_compact_bytes
+
+_SANDBOX_COMPILE_FLAGS = getattr(ast, "PyCF_ALLOW_TOP_LEVEL_AWAIT", 0)
+
+
+@lru_cache(maxsize=256)
+def _compile_sandbox(code: str) -> Tuple[CodeType, bool]:
+    """Compile ``code`` once; the flag says whether ``eval`` returns a coroutine."""
+
+    compiled = compile(code, "<sandbox>", "exec", flags=_SANDBOX_COMPILE_FLAGS)
+    return compiled, bool(compiled.co_flags & inspect.CO_COROUTINE)
+
+
+class _DummyInitResult:
+    protocolVersion = mcp_types.LATEST_PROTOCOL_VERSION
+    capabilities = mcp_types.ServerCapabilities()
+
+
+# Shared stand-in for ClientSession.initialize; bypasses the handshake
+_INIT_RESULT = _DummyInitResult()
+
+
+async def _fake_init(self):
+    return _INIT_RESULT
+
+
+def _patch_bridge_stdio(stack: ExitStack, stdio_client: Any) -> None:
+    """Swap in a fake stdio transport and skip the MCP handshake."""
+
+    stack.enter_context(mock.patch.object(bridge_module, "stdio_client", stdio_client))
+    stack.enter_context(
+        mock.patch.object(bridge_module.ClientSession, "initialize", _fake_init)
+    )
+
+
+RpcHandler = Callable[[Dict[str, object]], Awaitable[Dict[str, object]]]
+
+# Handler for the execution running in the current context; proxies are
+# shared across executions, so they look it up here rather than capturing it.
+_current_rpc: ContextVar[Optional[RpcHandler]] = ContextVar(
+    "in_process_rpc_handler", default=None
+)
+
+
+async def _rpc_call(payload: Dict[str, object]) -> Dict[str, object]:
+    if not isinstance(payload, dict):
+        raise RuntimeError("RPC payload must be a dictionary")
+    rpc_handler = _current_rpc.get()
+    if rpc_handler is None:
+        raise RuntimeError("MCP RPC handler is not available")
+    return await rpc_handler(payload)
+
+
+class _MCPProxy:
+    def __init__(self, server_info: Dict[str, object]):
+        self._server_name = str(server_info.get("name"))
+        raw_tools = server_info.get("tools", [])
+        self._raw_tools = raw_tools if isinstance(raw_tools, (list, tuple)) else ()
+        # Alias -> tool, built on the first tool lookup
+        self._tools: Optional[Dict[str, object]] = None
+        # Bound call wrappers per alias, built once on first access
+        self._invokers: Dict[str, Callable[..., Awaitable[object]]] = {}
+
+    def _tools_map(self) -> Dict[str, object]:
+        if self._tools is None:
+            self._tools = {str(tool["alias"]): tool for tool in self._raw_tools}
+        return self._tools
+
+    def _call_payload(self, target: str) -> Dict[str, object]:
+        return {"type": "call_tool", "server": self._server_name, "tool": target}
+
+    @staticmethod
+    async def _do_call(payload: Dict[str, object], **kwargs):
+        response = await _rpc_call({**payload, "arguments": kwargs})
+        if not response.get("success"):
+            raise RuntimeError(response.get("error", "MCP call failed"))
+        return response.get("result")
+
+    async def list_tools(self):
+        response = await _rpc_call({"type": "list_tools", "server": self._server_name})
+        if not response.get("success"):
+            raise RuntimeError(response.get("error", "Failed to list tools"))
+        return response.get("tools", [])
+
+    def __getattr__(self, alias: str):
+        invoker = self._invokers.get(alias)
+        if invoker is None:
+            # Unknown aliases are forwarded as raw tool names, like the container
+            tool = cast(Optional[Dict[str, object]], self._tools_map().get(alias))
+            target = str(tool["name"]) if tool else alias
+            invoker = partial(self._do_call, self._call_payload(target))
+            self._invokers[alias] = invoker
+        return invoker
+
+
+def _proxy_key(server: Dict[str, object]) -> tuple:
+    raw_tools = server.get("tools", [])
+    tools = raw_tools if isinstance(raw_tools, (list, tuple)) else []
+    return (
+        str(server.get("name")),
+        str(server.get("alias")),
+        tuple(sorted((str(tool["alias"]), str(tool["name"])) for tool in tools)),
+    )
+
+
+class _FastBuffer:
+    """Minimal text sink for redirect_stdout/stderr; joins once on read."""
+
+    __slots__ = ("_parts",)
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        return None
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
 
 class InProcessSandbox:
+    def __init__(self) -> None:
+        # Proxies and their ``mcp_<alias>`` names, reused while metadata matches
+        self._proxy_cache: Dict[tuple, Tuple[str, _MCPProxy]] = {}
+
     async def execute(
         self,
         code: str,
@@ -30,80 +175,37 @@ class InProcessSandbox:
         container_env: Optional[Dict[str, str]] = None,
         volume_mounts: Optional[Sequence[str]] = None,
         host_dir: Optional[Path] = None,
-        rpc_handler: Optional[
-            Callable[[Dict[str, object]], Awaitable[Dict[str, object]]]
-        ] = None,
+        rpc_handler: Optional[RpcHandler] = None,
     ) -> SandboxResult:
-        async def _rpc_call(payload: Dict[str, object]) -> Dict[str, object]:
-            if not isinstance(payload, dict):
-                raise RuntimeError("RPC payload must be a dictionary")
-            if rpc_handler is None:
-                raise RuntimeError("MCP RPC handler is not available")
-            return await rpc_handler(payload)
-
-        class _MCPProxy:
-            def __init__(self, server_info: Dict[str, object]):
-                self._server_name = str(server_info.get("name"))
-                raw_tools = server_info.get("tools", [])
-                if isinstance(raw_tools, (list, tuple)):
-                    tools = list(raw_tools)
-                else:
-                    tools = []
-                self._tools = {str(tool["alias"]): tool for tool in tools}
-
-            async def list_tools(self):
-                response = await _rpc_call(
-                    {"type": "list_tools", "server": self._server_name}
-                )
-                if not response.get("success"):
-                    raise RuntimeError(response.get("error", "Failed to list tools"))
-                return response.get("tools", [])
-
-            def __getattr__(self, alias: str):
-                tool = self._tools.get(alias)
-                target = tool.get("name") if tool else alias
-
-                async def _invoke(**kwargs):
-                    response = await _rpc_call(
-                        {
-                            "type": "call_tool",
-                            "server": self._server_name,
-                            "tool": target,
-                            "arguments": kwargs,
-                        }
-                    )
-                    if not response.get("success"):
-                        raise RuntimeError(response.get("error", "MCP call failed"))
-                    return response.get("result")
-
-                return _invoke
-
-        alias_map = {
-            str(server["name"]): str(server["alias"]) for server in servers_metadata
-        }
-        mcp_servers = {
-            str(server["name"]): _MCPProxy(server) for server in servers_metadata
+        mcp_servers: Dict[str, _MCPProxy] = {}
+        namespace: Dict[str, object] = {
+            "__name__": "__sandbox__",
+            "mcp_servers": mcp_servers,
         }
-
-        namespace = {"__name__": "__sandbox__", "mcp_servers": mcp_servers}
-        for server_name, proxy in mcp_servers.items():
-            alias = alias_map[server_name]
-            namespace[f"mcp_{alias}"] = proxy
-
-        flags = getattr(__import__("ast"), "PyCF_ALLOW_TOP_LEVEL_AWAIT", 0)
-        compiled = compile(code, "<sandbox>", "exec", flags=flags)
-
-        stdout_buf = StringIO()
-        stderr_buf = StringIO()
-
-        async def _run_user_code():
-            result = eval(compiled, namespace, namespace)
-            if asyncio.iscoroutine(result):
-                await result
-
+        for server in servers_metadata:
+            key = _proxy_key(server)
+            cached = self._proxy_cache.get(key)
+            if cached is None:
+                cached = (sys.intern(f"mcp_{key[1]}"), _MCPProxy(server))
+                self._proxy_cache[key] = cached
+            binding, proxy = cached
+            mcp_servers[key[0]] = proxy
+            namespace[binding] = proxy
+
+        compiled, is_coroutine = _compile_sandbox(code)
+
+        stdout_buf = _FastBuffer()
+        stderr_buf = _FastBuffer()
+
+        rpc_token = _current_rpc.set(rpc_handler)
         try:
+            # asyncio.timeout arms a deadline on this task; no wrapper task
             with redirect_stdout(stdout_buf), redirect_stderr(stderr_buf):
-                await asyncio.wait_for(_run_user_code(), timeout)
+                async with asyncio.timeout(timeout):
+                    if is_coroutine:
+                        await eval(compiled, namespace, namespace)
+                    else:
+                        eval(compiled, namespace, namespace)
             return SandboxResult(True, 0, stdout_buf.getvalue(), stderr_buf.getvalue())
         except asyncio.TimeoutError as exc:
             raise SandboxTimeout(
@@ -119,24 +221,43 @@ class InProcessSandbox:
         except Exception:  # pragma: no cover - diagnostic parity with container path
             traceback.print_exc(file=stderr_buf)
             return SandboxResult(False, 1, stdout_buf.getvalue(), stderr_buf.getvalue())
+        finally:
+            _current_rpc.reset(rpc_token)
 
 
 class StubIntegrationTests(unittest.IsolatedAsyncioTestCase):
     _original_config_sources: ClassVar[List[object]] = []
+    # Shared, read-only scaffolding; tests that add files remove them again
+    _config_dir: ClassVar[tempfile.TemporaryDirectory]
+    _STUB_CONFIG_NAME: ClassVar[str] = "stub_server.json"
 
     @classmethod
     def setUpClass(cls) -> None:
         cls._original_config_sources = list(bridge_module.CONFIG_SOURCES)
+        cls._config_dir = tempfile.TemporaryDirectory()
+        config = {
+            "mcpServers": {
+                "stub": {
+                    "command": sys.executable,
+                    "args": [str(_STUB_PATH)],
+                    "env": {},
+                }
+            }
+        }
+        Path(cls._config_dir.name, cls._STUB_CONFIG_NAME).write_bytes(
+            _dumps_config(config)
+        )
 
     @classmethod
     def tearDownClass(cls) -> None:
         bridge_module.CONFIG_SOURCES[:] = cls._original_config_sources
+        cls._config_dir.cleanup()
 
     async def asyncSetUp(self) -> None:
-        self._config_dir = tempfile.TemporaryDirectory()
         self._state_dir = tempfile.TemporaryDirectory()
-        self._original_state_dir = os.environ.get("MCP_BRIDGE_STATE_DIR")
-        os.environ["MCP_BRIDGE_STATE_DIR"] = self._state_dir.name
+        self.enterContext(
+            mock.patch.dict(os.environ, {"MCP_BRIDGE_STATE_DIR": self._state_dir.name})
+        )
 
         # Set up a single directory source for the test
         from mcp_server_code_execution_mode import ConfigSource
@@ -145,36 +266,16 @@ class StubIntegrationTests(unittest.IsolatedAsyncioTestCase):
             ConfigSource(Path(self._config_dir.name), "directory", name="Test Dir")
         ]
 
-        stub_path = Path(__file__).resolve().parent / "stub_mcp_server.py"
-        config = {
-            "mcpServers": {
-                "stub": {
-                    "command": sys.executable,
-                    "args": [str(stub_path)],
-                    "env": {},
-                }
-            }
-        }
-        Path(self._config_dir.name, "stub_server.json").write_text(json.dumps(config))
-
         self.bridge = bridge_module.MCPBridge(sandbox=InProcessSandbox())
 
     async def asyncTearDown(self) -> None:
         try:
-            for client in self.bridge.clients.values():
-                if getattr(client, "_session", None) is None:
-                    continue
-                try:
-                    client_obj = cast(bridge_module.ClientLike, client)
-                    await client_obj.stop()
-                except Exception:  # pragma: no cover - diagnostic aid
-                    traceback.print_exc()
+            # Stops every client concurrently; idle clients stop as a no-op
+            await self.bridge.shutdown()
         finally:
-            if self._original_state_dir is None:
-                os.environ.pop("MCP_BRIDGE_STATE_DIR", None)
-            else:
-                os.environ["MCP_BRIDGE_STATE_DIR"] = self._original_state_dir
-            self._config_dir.cleanup()
+            for extra in Path(self._config_dir.name).iterdir():
+                if extra.name != self._STUB_CONFIG_NAME:
+                    extra.unlink()
             self._state_dir.cleanup()
 
     async def test_stub_echo_tool(self) -> None:
@@ -219,8 +320,8 @@ class StubIntegrationTests(unittest.IsolatedAsyncioTestCase):
                 }
             }
         }
-        Path(self._config_dir.name, "opencode_config.json").write_text(
-            json.dumps(config)
+        Path(self._config_dir.name, "opencode_config.json").write_bytes(
+            _dumps_config(config)
         )
 
         # Add the explicit file source
@@ -245,8 +346,8 @@ class StubIntegrationTests(unittest.IsolatedAsyncioTestCase):
                 }
             }
         }
-        Path(self._config_dir.name, "broken_server.json").write_text(
-            json.dumps(broken_config)
+        Path(self._config_dir.name, "broken_server.json").write_bytes(
+            _dumps_config(broken_config)
         )
 
         @asynccontextmanager
@@ -269,32 +370,20 @@ class StubIntegrationTests(unittest.IsolatedAsyncioTestCase):
                 await read_send.aclose()
                 await write_send.aclose()
 
-        # Dummy initializer to bypass actual init sequence
-        class DummyInitResult:
-            protocolVersion = mcp_types.LATEST_PROTOCOL_VERSION
-            capabilities = mcp_types.ServerCapabilities()
-
-        async def fake_init(self):
-            return DummyInitResult()
-
-        with mock.patch.object(bridge_module, "stdio_client", fake_stdio_client):
-            with mock.patch.object(
-                bridge_module.ClientSession, "initialize", fake_init
-            ):
-                # Capture server-side logs for 'mcp.server.lowlevel.server'
-                log_stream = StringIO()
-                handler = logging.StreamHandler(log_stream)
-                server_logger = logging.getLogger("mcp.server.lowlevel.server")
-                server_logger.addHandler(handler)
-                try:
-                    await self.bridge.discover_servers()
-                    await self.bridge.load_server("broken")
-                finally:
-                    server_logger.removeHandler(handler)
-
-                logs = log_stream.getvalue()
-                self.assertNotIn("Received exception from stream", logs)
-                self.assertNotIn("Internal Server Error", logs)
+        with ExitStack() as stack:
+            _patch_bridge_stdio(stack, fake_stdio_client)
+            # Capture server-side logs for 'mcp.server.lowlevel.server'
+            log_stream = StringIO()
+            handler = logging.StreamHandler(log_stream)
+            server_logger = logging.getLogger("mcp.server.lowlevel.server")
+            server_logger.addHandler(handler)
+            stack.callback(server_logger.removeHandler, handler)
+            await self.bridge.discover_servers()
+            await self.bridge.load_server("broken")
+
+            logs = log_stream.getvalue()
+            self.assertNotIn("Received exception from stream", logs)
+            self.assertNotIn("Internal Server Error", logs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+import mcp_server_code_execution_mode as bridge_module
+from mcp_server_code_execution_mode import _dumps_compact_bytes, _loads_json
+
+
+def test_loads_json_keeps_integers_beyond_64_bits_exact() -> None:
+    big = 2**70
+    frame = b'{"type":"call_tool","arguments":{"n":%d,"small":7}}' % big
+    parsed = _loads_json(frame)
+    assert parsed == {"type": "call_tool", "arguments": {"n": big, "small": 7}}
+    assert type(parsed["arguments"]["n"]) is int  # type: ignore[index]
+
+
+def test_loads_json_keeps_integers_below_signed_64_bit_minimum_exact() -> None:
+    # Only 19 digits, but still outside the range orjson parses as int
+    for text in (b"-9223372036854775809", b"-9999999999999999999"):
+        parsed = _loads_json(text)
+        assert type(parsed) is int
+        assert parsed == int(text)
+
+
+def test_loads_json_round_trips_large_integers_through_dumps() -> None:
+    values = [
+        2**64 + 1,
+        -(2**80) - 1,
+        18446744073709551615,
+        -9223372036854775809,
+        -9999999999999999999,
+    ]
+    parsed = _loads_json(_dumps_compact_bytes({"values": values}))
+    # Compare exactly: a float approximation can still compare equal to an int
+    assert [(type(v), v) for v in parsed["values"]] == [  # type: ignore[index]
+        (int, v) for v in values
+    ]
+
+
+def test_loads_json_without_orjson_uses_stdlib() -> None:
+    with patch.object(bridge_module, "_orjson", None):
+        assert _loads_json(b'{"n":1180591620717411303424}') == {
+            "n": 1180591620717411303424
+        }
@@ -2,6 +2,7 @@ from unittest.mock import patch
 
 import pytest
 
+import mcp_server_code_execution_mode as bridge_module
 from mcp_server_code_execution_mode import (
     RootlessContainerSandbox,
     SandboxError,
@@ -9,6 +10,21 @@ from mcp_server_code_execution_mode import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_runtime_cache():
+    # Runtimes resolved before shutil.which is patched must not leak in
+    bridge_module._RUNTIME_WHICH_CACHE.clear()
+    yield
+    bridge_module._RUNTIME_WHICH_CACHE.clear()
+
+
+def test_detect_runtime_caches_successful_lookups():
+    with patch("shutil.which", return_value="/usr/bin/podman") as which:
+        assert detect_runtime("podman") == "podman"
+        assert detect_runtime("podman") == "podman"
+    assert which.call_count == 1
+
+
 def test_detect_runtime_none():
     with patch("shutil.which", return_value=None):
         assert detect_runtime() is None
@@ -29,3 +45,36 @@ async def test_sandbox_init_no_runtime():
         # Should crash on _base_cmd
         with pytest.raises(SandboxError, match="No container runtime found"):
             sandbox._base_cmd()
+
+
+def test_base_cmd_uses_configured_tmpfs_and_disables_swap():
+    with patch("shutil.which", return_value="/usr/bin/podman"):
+        sandbox = RootlessContainerSandbox(
+            runtime="podman",
+            memory_limit="256m",
+            tmpfs_tmp_size="16m",
+            tmpfs_workspace_size="32m",
+        )
+    cmd = sandbox._base_cmd()
+    assert cmd[cmd.index("--memory-swap") + 1] == "256m"
+    assert "/tmp:rw,noexec,nosuid,nodev,size=16m" in cmd
+    assert "/workspace:rw,noexec,nosuid,nodev,size=32m" in cmd
+
+
+def test_detect_runtime_rechecks_when_path_changes(monkeypatch):
+    monkeypatch.setenv("PATH", "/first")
+    with patch("shutil.which", return_value="/first/podman") as which:
+        assert detect_runtime("podman") == "podman"
+        monkeypatch.setenv("PATH", "/second")
+        assert detect_runtime("podman") == "podman"
+    assert [call.kwargs["path"] for call in which.call_args_list] == [
+        "/first",
+        "/second",
+    ]
+
+
+def test_filter_runtime_stderr_drops_podman_pull_chatter():
+    with patch("shutil.which", return_value="/usr/bin/podman"):
+        sandbox = RootlessContainerSandbox(runtime="podman")
+    text = 'Trying to pull x\n  Copying blob abc\nreal error\n\nResolved "a"\nend'
+    assert sandbox._filter_runtime_stderr(text) == "real error\n\nend"
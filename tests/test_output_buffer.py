@@ -0,0 +1,24 @@
+from mcp_server_code_execution_mode import _BoundedTextBuffer
+
+
+def test_buffer_keeps_everything_under_limit() -> None:
+    buffer = _BoundedTextBuffer(limit=10)
+    buffer.append("abc")
+    buffer.append("")
+    buffer.append("def")
+    assert buffer.getvalue() == "abcdef"
+
+
+def test_buffer_keeps_most_recent_text_and_marks_truncation() -> None:
+    buffer = _BoundedTextBuffer(limit=5)
+    buffer.append("abc")
+    buffer.append("defgh")
+    assert buffer.getvalue() == "...[truncated 3 characters]...\ndefgh"
+    buffer.append("ij")
+    assert buffer.getvalue() == "...[truncated 5 characters]...\nfghij"
+
+
+def test_buffer_without_limit_is_unbounded() -> None:
+    buffer = _BoundedTextBuffer(limit=0)
+    buffer.append("x" * 100)
+    assert buffer.getvalue() == "x" * 100
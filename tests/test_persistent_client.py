@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+import anyio
+import mcp.types as mcp_types
+
+import mcp_server_code_execution_mode as bridge_module
+from mcp_server_code_execution_mode import MCPServerInfo, PersistentMCPClient
+
+
+class _CountingSession:
+    def __init__(self) -> None:
+        self.list_calls = 0
+
+    async def list_tools(self):
+        self.list_calls += 1
+        return SimpleNamespace(
+            tools=[
+                mcp_types.Tool(
+                    name="echo",
+                    description="Echo",
+                    inputSchema={"type": "object"},
+                )
+            ]
+        )
+
+
+class PersistentClientToolCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def test_list_tools_is_cached_until_list_changed(self) -> None:
+        client = PersistentMCPClient(
+            MCPServerInfo(name="demo", command="fake", args=[], env={})
+        )
+        session = _CountingSession()
+        client._session = session  # type: ignore[assignment]
+
+        first = await client.list_tools()
+        second = await client.list_tools()
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["name"], "echo")
+        self.assertEqual(session.list_calls, 1)
+
+        notification = mcp_types.ServerNotification(
+            mcp_types.ToolListChangedNotification(
+                method="notifications/tools/list_changed"
+            )
+        )
+        await client._handle_message(notification)
+        await client.list_tools()
+        self.assertEqual(session.list_calls, 2)
+
+    async def test_start_prefetches_tools_when_advertised(self) -> None:
+        @asynccontextmanager
+        async def fake_stdio_client(server: Any):
+            send, _recv = anyio.create_memory_object_stream[Any](0)
+            _send, recv = anyio.create_memory_object_stream[Any](0)
+            try:
+                yield (recv, send)
+            finally:
+                await send.aclose()
+                await recv.aclose()
+
+        async def fake_init(self):
+            return SimpleNamespace(
+                capabilities=mcp_types.ServerCapabilities(
+                    tools=mcp_types.ToolsCapability()
+                )
+            )
+
+        session = _CountingSession()
+
+        async def fake_list_tools(self):
+            return await session.list_tools()
+
+        client = PersistentMCPClient(
+            MCPServerInfo(name="demo", command="fake", args=[], env={})
+        )
+        with mock.patch.object(bridge_module, "stdio_client", fake_stdio_client):
+            with mock.patch.object(bridge_module.ClientSession, "initialize", fake_init):
+                with mock.patch.object(
+                    bridge_module.ClientSession, "list_tools", fake_list_tools
+                ):
+                    await client.start()
+                    self.assertEqual(session.list_calls, 1)
+                    tools = await client.list_tools()
+                    self.assertEqual(session.list_calls, 1)
+                    await client.stop()
+        self.assertEqual(tools[0]["name"], "echo")
+
+    async def test_stop_from_another_task_closes_transport(self) -> None:
+        events = []
+
+        @asynccontextmanager
+        async def scoped_stdio_client(server: Any):
+            # Like the real client, the transport lives inside a cancel scope
+            async with anyio.create_task_group():
+                send, _recv = anyio.create_memory_object_stream[Any](1)
+                _send, recv = anyio.create_memory_object_stream[Any](1)
+                try:
+                    yield (recv, send)
+                finally:
+                    await send.aclose()
+                    await recv.aclose()
+            events.append("transport closed")
+
+        async def fake_init(self):
+            return SimpleNamespace(capabilities=mcp_types.ServerCapabilities())
+
+        client = PersistentMCPClient(
+            MCPServerInfo(name="demo", command="fake", args=[], env={})
+        )
+        with mock.patch.object(bridge_module, "stdio_client", scoped_stdio_client):
+            with mock.patch.object(bridge_module.ClientSession, "initialize", fake_init):
+                # load_server runs in a gather task; shutdown in another one
+                await asyncio.create_task(client.start())
+                with self.assertNoLogs(bridge_module.logger, "WARNING"):
+                    await asyncio.create_task(client.stop())
+        self.assertEqual(events, ["transport closed"])
+        self.assertIsNone(client._session)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from typing import Dict, List, Tuple
+
+import mcp_server_code_execution_mode as bridge_module
+from mcp_server_code_execution_mode import (
+    DEFAULT_TIMEOUT,
+    MAX_TIMEOUT,
+    _ArgumentValidationError,
+    _parse_run_python_args,
+)
+
+
+class RunPythonArgumentTests(unittest.IsolatedAsyncioTestCase):
+    def test_defaults_and_clamping(self) -> None:
+        self.assertEqual(
+            _parse_run_python_args({"code": "print(1)"}),
+            ("print(1)", [], DEFAULT_TIMEOUT),
+        )
+        _, servers, timeout = _parse_run_python_args(
+            {"code": "x", "servers": ["a", "b"], "timeout": MAX_TIMEOUT + 100}
+        )
+        self.assertEqual(servers, ["a", "b"])
+        self.assertEqual(timeout, MAX_TIMEOUT)
+
+    def test_rejects_bad_fields(self) -> None:
+        cases: List[Tuple[Dict[str, object], str]] = [
+            ({}, "Missing 'code' argument"),
+            ({"code": "   "}, "Missing 'code' argument"),
+            ({"code": "x", "servers": "a"}, "'servers' must be a list of strings"),
+            ({"code": "x", "servers": [1]}, "'servers' must be a list of strings"),
+            ({"code": "x", "timeout": True}, "'timeout' must be an integer"),
+            ({"code": "x", "timeout": 1.5}, "'timeout' must be an integer"),
+        ]
+        for arguments, message in cases:
+            with self.subTest(arguments=arguments):
+                with self.assertRaises(_ArgumentValidationError) as ctx:
+                    _parse_run_python_args(arguments)
+                self.assertEqual(str(ctx.exception), message)
+
+    async def test_call_tool_reports_validation_error(self) -> None:
+        response = await bridge_module.call_tool(
+            "run_python", {"code": "x", "servers": [None]}
+        )
+        self.assertTrue(response.isError)
+        structured = response.structuredContent or {}
+        self.assertEqual(structured.get("status"), "validation_error")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
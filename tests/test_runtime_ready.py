@@ -0,0 +1,46 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from mcp_server_code_execution_mode import RootlessContainerSandbox
+
+
+class _CountingPodmanSandbox(RootlessContainerSandbox):
+    def __init__(self) -> None:
+        with patch("shutil.which", return_value=None):
+            super().__init__(runtime_idle_timeout=0)
+        self.runtime = "podman"
+        self.commands: list[tuple[str, ...]] = []
+
+    async def _run_runtime_command(self, *args: str) -> tuple[int, str, str]:
+        self.commands.append(args)
+        await asyncio.sleep(0.01)
+        return 0, "{}", ""
+
+
+class RuntimeReadyTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_callers_share_one_runtime_check(self) -> None:
+        sandbox = _CountingPodmanSandbox()
+        await asyncio.gather(*(sandbox._ensure_runtime_ready() for _ in range(5)))
+        await sandbox._ensure_runtime_ready()
+        self.assertEqual(sandbox.commands, [("info", "--format", "{{json .}}")])
+
+    async def test_stopping_runtime_forces_a_new_check(self) -> None:
+        sandbox = _CountingPodmanSandbox()
+        await sandbox._ensure_runtime_ready()
+        await sandbox._stop_runtime()
+        await sandbox._ensure_runtime_ready()
+        info_calls = [cmd for cmd in sandbox.commands if cmd[0] == "info"]
+        self.assertEqual(len(info_calls), 2)
+
+    async def test_readiness_expires_after_ttl(self) -> None:
+        sandbox = _CountingPodmanSandbox()
+        sandbox._runtime_ready_ttl = 0.0
+        await sandbox._ensure_runtime_ready()
+        await sandbox._ensure_runtime_ready()
+        info_calls = [cmd for cmd in sandbox.commands if cmd[0] == "info"]
+        self.assertEqual(len(info_calls), 2)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from contextlib import asynccontextmanager
+from contextlib import ExitStack, asynccontextmanager
 from typing import Any, cast
 from unittest import mock
 
@@ -10,6 +10,39 @@ import mcp_server_code_execution_mode as bridge_module
 from mcp_server_code_execution_mode import MCPServerInfo
 
 
+class _DummyInitResult:
+    protocolVersion = mcp_types.LATEST_PROTOCOL_VERSION
+    capabilities = mcp_types.ServerCapabilities()
+
+
+# Shared stand-in for ClientSession.initialize; bypasses the handshake
+_INIT_RESULT = _DummyInitResult()
+
+
+async def _fake_init(self):
+    return _INIT_RESULT
+
+
+def _patch_bridge_stdio(stack: ExitStack, stdio_client: Any) -> None:
+    """Swap in a fake stdio transport and skip the MCP handshake."""
+
+    stack.enter_context(mock.patch.object(bridge_module, "stdio_client", stdio_client))
+    stack.enter_context(
+        mock.patch.object(bridge_module.ClientSession, "initialize", _fake_init)
+    )
+
+
+def _make_stdio_pair():
+    """Return ``(read_stream, write_stream)`` for a fake stdio client.
+
+    Single-slot buffers let a send complete without waiting for the peer.
+    """
+
+    write_send, _write_recv = anyio.create_memory_object_stream(1)
+    _read_send, read_recv = anyio.create_memory_object_stream(1)
+    return read_recv, write_send
+
+
 class ServerCwdTests(unittest.IsolatedAsyncioTestCase):
     async def test_server_start_uses_configured_cwd(self) -> None:
         # Arrange: create a bridge and a server config with a cwd
@@ -30,28 +63,18 @@ class ServerCwdTests(unittest.IsolatedAsyncioTestCase):
         async def fake_stdio_client(server: Any):
             # Capture the provided parameters
             captured["params"] = server
-            # Create memory streams compatible with ClientSession
-            send, recv = anyio.create_memory_object_stream(0)
-            recv_send, recv_recv = anyio.create_memory_object_stream(0)
             # The stdio client yields (read_stream, write_stream)
+            recv_recv, send = _make_stdio_pair()
             try:
                 yield (recv_recv, send)
             finally:
                 await send.aclose()
                 await recv_recv.aclose()
 
-        # Patch stdio_client to our fake implementation
-        # Patch ClientSession.initialize to a trivial initializer
-        class DummyInitResult:
-            protocolVersion = mcp_types.LATEST_PROTOCOL_VERSION
-            capabilities = mcp_types.ServerCapabilities()
-
-        async def fake_init(self):
-            return DummyInitResult()
-        with mock.patch.object(bridge_module, "stdio_client", fake_stdio_client):
-            with mock.patch.object(bridge_module.ClientSession, "initialize", fake_init):
-                # Act
-                await bridge.load_server(server_name)
+        with ExitStack() as stack:
+            _patch_bridge_stdio(stack, fake_stdio_client)
+            # Act
+            await bridge.load_server(server_name)
 
         # Assert
         self.assertIn("params", captured)
@@ -86,27 +109,19 @@ class ServerCwdTests(unittest.IsolatedAsyncioTestCase):
         @asynccontextmanager
         async def fake_stdio_client(server: Any):
             captured["params"] = server
-            send, recv = anyio.create_memory_object_stream(0)
-            recv_send, recv_recv = anyio.create_memory_object_stream(0)
+            recv_recv, send = _make_stdio_pair()
             try:
                 yield (recv_recv, send)
             finally:
                 await send.aclose()
                 await recv_recv.aclose()
 
-        class DummyInitResult:
-            protocolVersion = mcp_types.LATEST_PROTOCOL_VERSION
-            capabilities = mcp_types.ServerCapabilities()
-
-        async def fake_init(self):
-            return DummyInitResult()
-
-        with mock.patch.object(bridge_module, "stdio_client", fake_stdio_client):
-            with mock.patch.object(bridge_module.ClientSession, "initialize", fake_init):
-                with mock.patch.object(bridge_module, "logger") as fake_logger:
-                    await bridge.load_server(server_name)
-                    # logger.warning should be called once because cwd doesn't exist
-                    self.assertTrue(fake_logger.warning.called)
+        with ExitStack() as stack:
+            _patch_bridge_stdio(stack, fake_stdio_client)
+            fake_logger = stack.enter_context(mock.patch.object(bridge_module, "logger"))
+            await bridge.load_server(server_name)
+            # logger.warning should be called once because cwd doesn't exist
+            self.assertTrue(fake_logger.warning.called)
 
         # Cleanup
         if server_name in bridge.clients:
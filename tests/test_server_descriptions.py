@@ -82,3 +82,17 @@ async def test_discover_servers_returns_dict():
             assert (
                 bridge.servers["test-server"].description == "Description from config"
             )
+
+
+def test_render_entrypoint_does_not_rescan_substituted_text():
+    """Placeholder names inside user data must survive substitution verbatim."""
+
+    sandbox = RootlessContainerSandbox(runtime="podman")
+    code = "print('__METADATA_JSON__')"
+    discovered = {"odd-server": "mentions __CODE_LITERAL__"}
+
+    entrypoint_script = sandbox._render_entrypoint(code, [], discovered)
+
+    assert repr(code) in entrypoint_script
+    assert "mentions __CODE_LITERAL__" in entrypoint_script
+    assert "AVAILABLE_SERVERS = json.loads('[]')" in entrypoint_script
@@ -1,7 +1,18 @@
-import unittest
-from typing import Any, Dict, List, cast
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import patch
+from typing import Any, AsyncIterator, Dict, List, Mapping, Sequence, cast
 
-from mcp_server_code_execution_mode import MCPBridge, MCPServerInfo, SandboxInvocation
+import pytest
+import pytest_asyncio
+
+from mcp_server_code_execution_mode import (
+    MCPBridge,
+    MCPServerInfo,
+    SandboxInvocation,
+    _trigrams,
+)
 
 
 class _DummySandbox:
@@ -9,94 +20,369 @@ class _DummySandbox:
         return None
 
 
+# Stateless, so every bridge can share it
+_DUMMY_SANDBOX = _DummySandbox()
+
+
 class _FakeClient:
     def __init__(self, tools):
         self._tools = tools
+        self.stopped = False
 
     async def list_tools(self):
         return self._tools
 
+    async def call_tool(self, name, arguments):
+        if name == "fail":
+            raise RuntimeError("boom")
+        return {"tool": name, "arguments": arguments}
+
+    async def stop(self):
+        self.stopped = True
+
+
+class _FailingStopClient(_FakeClient):
+    async def stop(self):
+        raise RuntimeError("stop failed")
+
+
+_DEMO_TOOLS: Sequence[Mapping[str, Any]] = (
+    {
+        "name": "list_things",
+        "description": "List available things",
+        "inputSchema": {"type": "object"},
+    },
+    {
+        "name": "get_thing",
+        "description": "Retrieve a single thing",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"id": {"type": "string"}},
+        },
+    },
+)
+
+# One event loop services the whole module instead of one per test
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def bridge(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> AsyncIterator[MCPBridge]:
+    # Tests shut down, extend, and cache into the bridge (and edit the server
+    # description), so only the sandbox and tool list are shared
+    monkeypatch.setenv("MCP_BRIDGE_STATE_DIR", str(tmp_path))
+    bridge = MCPBridge(sandbox=_DUMMY_SANDBOX)
+    bridge.servers["demo-server"] = MCPServerInfo(
+        name="demo-server",
+        command="fake",
+        args=[],
+        env={},
+    )
+    bridge.clients["demo-server"] = _FakeClient(_DEMO_TOOLS)
+    bridge.loaded_servers.add("demo-server")
+    yield bridge
+    await bridge.shutdown()
+
+
+async def test_get_tool_docs_summary_and_full(bridge: MCPBridge) -> None:
+    summary_docs = await bridge.get_tool_docs("demo-server")
+    assert len(summary_docs) == 2
+    assert summary_docs[0]["server"] == "demo-server"
+    assert "description" in summary_docs[0]
+    full_doc = await bridge.get_tool_docs(
+        "demo-server", tool="get_thing", detail="full"
+    )
+    assert len(full_doc) == 1
+    assert "inputSchema" in full_doc[0]
+
+
+async def test_get_tool_docs_reuses_formatted_docs(bridge: MCPBridge) -> None:
+    first = await bridge.get_tool_docs("demo-server", detail="full")
+    first.clear()
+    second = await bridge.get_tool_docs("demo-server", detail="FULL")
+    assert len(second) == 2
+    again = await bridge.get_tool_docs("demo-server", detail="full")
+    assert again is not second
+    assert all(a is b for a, b in zip(again, second))
+    summary = await bridge.get_tool_docs("demo-server", tool="GET_THING")
+    assert "inputSchema" not in summary[0]
+
+    await bridge._fetch_server_metadata("demo-server")
+    refreshed = await bridge.get_tool_docs("demo-server", detail="full")
+    assert refreshed[0] is not second[0]
+
+
+async def test_search_tool_docs(bridge: MCPBridge) -> None:
+    results = await bridge.search_tool_docs(
+        "retrieve",
+        allowed_servers=["demo-server"],
+        limit=5,
+        detail="summary",
+    )
+    assert len(results) == 1
+    assert results[0]["tool"] == "get_thing"
+    full_results = await bridge.search_tool_docs(
+        "thing",
+        allowed_servers=["demo-server"],
+        limit=1,
+        detail="full",
+    )
+    assert len(full_results) == 1
+    assert "inputSchema" in full_results[0]
+
+
+async def test_search_candidates_are_pruned_by_trigrams(bridge: MCPBridge) -> None:
+    await bridge._ensure_server_metadata("demo-server")
+    shard = bridge._search_shards["demo-server"]
+    names = [entry.info["name"] for entry in shard.entries]
+    candidates = shard.candidates(frozenset(_trigrams("retrieve")))
+    assert [names[i] for i in candidates] == ["get_thing"]
+    assert list(shard.candidates(frozenset({"zzz", "thi"}))) == []
+    # Short tokens cannot prune, so every entry stays a candidate
+    assert len(shard.candidates(frozenset())) == 2
+
+
+async def test_search_with_unknown_token_returns_nothing(bridge: MCPBridge) -> None:
+    results = await bridge.search_tool_docs(
+        "thing qqqx", allowed_servers=["demo-server"]
+    )
+    assert results == []
+
+
+async def test_search_tool_docs_requires_every_token(bridge: MCPBridge) -> None:
+    # Overlapping tokens must each be matched independently
+    results = await bridge.search_tool_docs(
+        "THING hing single",
+        allowed_servers=["demo-server"],
+    )
+    assert [doc["tool"] for doc in results] == ["get_thing"]
+    none = await bridge.search_tool_docs(
+        "thing missing",
+        allowed_servers=["demo-server"],
+    )
+    assert none == []
+
+
+async def test_search_tool_docs_only_scans_allowed_servers(bridge: MCPBridge) -> None:
+    bridge.servers["other-server"] = MCPServerInfo(
+        name="other-server", command="fake", args=[], env={}
+    )
+    bridge.clients["other-server"] = _FakeClient(
+        [{"name": "get_other_thing", "description": "Another thing"}]
+    )
+    bridge.loaded_servers.add("other-server")
+    await bridge._ensure_server_metadata("other-server")
+
+    only_demo = await bridge.search_tool_docs(
+        "thing", allowed_servers=["demo-server"], limit=10
+    )
+    assert {doc["server"] for doc in only_demo} == {"demo-server"}
+    only_other = await bridge.search_tool_docs(
+        "thing", allowed_servers=["other-server", "other-server"], limit=10
+    )
+    assert [doc["tool"] for doc in only_other] == ["get_other_thing"]
+    capped = await bridge.search_tool_docs(
+        "thing", allowed_servers=["other-server", "demo-server"], limit=1
+    )
+    assert len(capped) == 1
 
-class ToolDocsTests(unittest.IsolatedAsyncioTestCase):
-    async def asyncSetUp(self) -> None:
-        self.bridge = MCPBridge(sandbox=_DummySandbox())
-        self.bridge.servers["demo-server"] = MCPServerInfo(
-            name="demo-server",
-            command="fake",
-            args=[],
-            env={},
-        )
-        self.bridge.clients["demo-server"] = _FakeClient(
-            [
-                {
-                    "name": "list_things",
-                    "description": "List available things",
-                    "inputSchema": {"type": "object"},
-                },
-                {
-                    "name": "get_thing",
-                    "description": "Retrieve a single thing",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {"id": {"type": "string"}},
-                    },
-                },
-            ]
-        )
-        self.bridge.loaded_servers.add("demo-server")
-
-    async def test_get_tool_docs_summary_and_full(self) -> None:
-        summary_docs = await self.bridge.get_tool_docs("demo-server")
-        self.assertEqual(len(summary_docs), 2)
-        self.assertEqual(summary_docs[0]["server"], "demo-server")
-        self.assertIn("description", summary_docs[0])
-        full_doc = await self.bridge.get_tool_docs("demo-server", tool="get_thing", detail="full")
-        self.assertEqual(len(full_doc), 1)
-        self.assertIn("inputSchema", full_doc[0])
-
-    async def test_search_tool_docs(self) -> None:
-        results = await self.bridge.search_tool_docs(
-            "retrieve",
-            allowed_servers=["demo-server"],
-            limit=5,
-            detail="summary",
-        )
-        self.assertEqual(len(results), 1)
-        self.assertEqual(results[0]["tool"], "get_thing")
-        full_results = await self.bridge.search_tool_docs(
-            "thing",
-            allowed_servers=["demo-server"],
-            limit=1,
-            detail="full",
-        )
-        self.assertEqual(len(full_results), 1)
-        self.assertIn("inputSchema", full_results[0])
 
-    async def test_rpc_handlers_expose_docs(self) -> None:
-        async with SandboxInvocation(self.bridge, ["demo-server"]) as invocation:
-            query_response = await invocation.handle_rpc(
+async def test_concurrent_metadata_requests_share_one_fetch(bridge: MCPBridge) -> None:
+    client = cast(_FakeClient, bridge.clients["demo-server"])
+    calls: List[str] = []
+    original = client.list_tools
+
+    async def _counting_list_tools():
+        calls.append("list_tools")
+        await asyncio.sleep(0)
+        return await original()
+
+    client.list_tools = _counting_list_tools  # type: ignore[method-assign]
+    await asyncio.gather(
+        bridge.get_cached_server_metadata("demo-server"),
+        bridge.search_tool_docs("thing", allowed_servers=["demo-server"]),
+        bridge.get_tool_docs("demo-server"),
+    )
+    assert calls == ["list_tools"]
+
+
+async def test_alias_collisions_get_suffixes(bridge: MCPBridge) -> None:
+    assert bridge._alias_for("demo-server") == "demo_server"
+    assert bridge._alias_for("Demo.Server") == "demo_server_2"
+    assert bridge._alias_for("demo server") == "demo_server_3"
+    assert bridge._alias_for("demo-server") == "demo_server"
+
+
+async def test_search_keywords_are_ordered_and_deduplicated(bridge: MCPBridge) -> None:
+    await bridge._ensure_server_metadata("demo-server")
+    docs = bridge._server_docs_cache["demo-server"]
+    entry = cast(List[Dict[str, Any]], docs["tools"])[0]
+    assert (
+        entry["keywords"] == "demo-server demo_server list_things list available things"
+    )
+    assert "demo-server" in entry["keyword_tokens"]
+    assert "available" in entry["keyword_tokens"]
+
+
+async def test_cached_metadata_is_read_only(bridge: MCPBridge) -> None:
+    metadata = await bridge.get_cached_server_metadata("demo-server")
+    tools = cast(Sequence[Mapping[str, Any]], metadata["tools"])
+    assert len(tools) == 2
+    with pytest.raises(TypeError):
+        tools[0]["input_schema"]["mutated"] = True  # type: ignore[index]
+    with pytest.raises(TypeError):
+        metadata["cwd"] = "/elsewhere"  # type: ignore[index]
+    again = await bridge.get_cached_server_metadata("demo-server")
+    assert again is metadata
+
+
+async def test_invocation_reuses_serialised_metadata(bridge: MCPBridge) -> None:
+    async with SandboxInvocation(bridge, ["demo-server"]) as first:
+        first_json = first.container_env["MCP_AVAILABLE_SERVERS"]
+    async with SandboxInvocation(bridge, ["demo-server"]) as second:
+        assert second.container_env["MCP_AVAILABLE_SERVERS"] is first_json
+
+    bridge.servers["demo-server"].description = "Updated"
+    async with SandboxInvocation(bridge, ["demo-server"]) as third:
+        discovered = json.loads(third.container_env["MCP_DISCOVERED_SERVERS"])
+    assert discovered["demo-server"] == "Updated"
+
+
+async def test_execute_code_loads_known_servers_during_discovery(
+    bridge: MCPBridge,
+) -> None:
+    events: List[str] = []
+    load_started = asyncio.Event()
+
+    async def _discover() -> Dict[str, str]:
+        events.append("discover:start")
+        await asyncio.wait_for(load_started.wait(), 1)
+        events.append("discover:end")
+        return {}
+
+    async def _load(name: str) -> None:
+        events.append(f"load:{name}")
+        load_started.set()
+
+    class _StopSandbox(_DummySandbox):
+        async def execute(self, *_args, **_kwargs):
+            raise RuntimeError("stop")
+
+    bridge.sandbox = _StopSandbox()
+    with patch.object(bridge, "discover_servers", _discover):
+        with patch.object(bridge, "load_server", _load):
+            with pytest.raises(RuntimeError):
+                await bridge.execute_code("pass", servers=["demo-server"])
+    assert events == ["discover:start", "load:demo-server", "discover:end"]
+
+
+async def test_execute_code_waits_for_discovery_when_a_load_fails(
+    bridge: MCPBridge,
+) -> None:
+    events: List[str] = []
+    load_failed = asyncio.Event()
+
+    async def _discover() -> Dict[str, str]:
+        events.append("discover:start")
+        await asyncio.wait_for(load_failed.wait(), 1)
+        # Still rescanning well after the load has failed
+        await asyncio.sleep(0.05)
+        events.append("discover:end")
+        return {}
+
+    async def _load(name: str) -> None:
+        load_failed.set()
+        raise RuntimeError(f"cannot start {name}")
+
+    with patch.object(bridge, "discover_servers", _discover):
+        with patch.object(bridge, "load_server", _load):
+            with pytest.raises(RuntimeError, match="cannot start demo-server"):
+                await bridge.execute_code("pass", servers=["demo-server"])
+    assert events == ["discover:start", "discover:end"]
+
+
+async def test_invocations_never_share_ipc_dirs(
+    bridge: MCPBridge, tmp_path: Path
+) -> None:
+    async with SandboxInvocation(bridge, ["demo-server"]) as first:
+        first_dir = first.host_dir
+        assert first_dir is not None
+        assert first_dir.parent == tmp_path
+        (first_dir / "entrypoint.py").write_text("print('x')")
+    # Removed on exit so a lingering container cannot reach the next run
+    assert not first_dir.exists()
+    async with SandboxInvocation(bridge, ["demo-server"]) as second:
+        assert second.host_dir is not None
+        assert second.host_dir != first_dir
+        assert list(second.host_dir.iterdir()) == []
+
+
+async def test_rpc_handlers_expose_docs(bridge: MCPBridge) -> None:
+    async with SandboxInvocation(bridge, ["demo-server"]) as invocation:
+        # Independent requests overlap, as concurrent sandbox calls would
+        query_response, search_response = await asyncio.gather(
+            invocation.handle_rpc(
                 {
                     "type": "query_tool_docs",
                     "server": "demo-server",
                     "tool": "list_things",
                     "detail": "summary",
                 }
-            )
-            self.assertTrue(query_response["success"])
-            docs = cast(List[Dict[str, Any]], query_response.get("docs", []))
-            self.assertEqual(len(docs), 1)
-            search_response = await invocation.handle_rpc(
+            ),
+            invocation.handle_rpc(
                 {
                     "type": "search_tool_docs",
                     "query": "list",
                     "limit": 2,
                     "detail": "summary",
                 }
-            )
-            self.assertTrue(search_response["success"])
-            results = cast(List[Dict[str, Any]], search_response.get("results", []))
-            self.assertGreaterEqual(len(results), 1)
+            ),
+        )
+    assert query_response["success"]
+    # isinstance narrows the payload for type checkers without a cast
+    docs = query_response["docs"]
+    assert isinstance(docs, list) and len(docs) == 1
+    assert search_response["success"]
+    results = search_response["results"]
+    assert isinstance(results, list) and len(results) >= 1
+
+
+async def test_batch_call_preserves_order_and_reports_errors(bridge: MCPBridge) -> None:
+    async with SandboxInvocation(bridge, ["demo-server"]) as invocation:
+        response = await invocation.handle_rpc(
+            {
+                "type": "batch_call",
+                "calls": [
+                    {
+                        "server": "demo-server",
+                        "tool": "get_thing",
+                        "arguments": {"id": "1"},
+                    },
+                    {"server": "demo-server", "tool": "fail", "arguments": {}},
+                    {"server": "other", "tool": "get_thing", "arguments": {}},
+                ],
+                "maxConcurrent": 2,
+            }
+        )
+    assert response["success"]
+    results = cast(List[Dict[str, Any]], response["results"])
+    assert results[0] == {
+        "success": True,
+        "result": {"tool": "get_thing", "arguments": {"id": "1"}},
+    }
+    assert results[1] == {"success": False, "error": "boom"}
+    assert not results[2]["success"]
+
+
+async def test_shutdown_stops_all_clients(bridge: MCPBridge) -> None:
+    demo_client = cast(_FakeClient, bridge.clients["demo-server"])
+    bridge.clients["broken"] = _FailingStopClient([])
+    bridge.loaded_servers.add("broken")
 
+    await bridge.shutdown()
 
-if __name__ == "__main__":  # pragma: no cover
-    unittest.main()
+    assert demo_client.stopped
+    assert bridge.clients == {}
+    assert bridge.loaded_servers == set()
@@ -0,0 +1,105 @@
+import asyncio
+import sys
+from pathlib import Path
+from typing import Sequence
+
+import pytest
+
+import mcp_server_code_execution_mode as bridge_module
+from mcp_server_code_execution_mode import MCPBridge, RootlessContainerSandbox
+
+
+class _LocalSandbox(RootlessContainerSandbox):
+    """Run the container payload with the host interpreter instead of a runtime."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(runtime="docker", runtime_idle_timeout=0, **kwargs)
+        self.runtime = "docker"
+        self._base_cmd_template = self._build_base_cmd()
+        self.spawned: list[list[str]] = []
+        self.ipc_dir: Path | None = None
+
+    async def _ensure_runtime_ready(self) -> None:
+        return None
+
+    async def _spawn_container(self, cmd: Sequence[str]):
+        self.spawned.append(list(cmd))
+        if "-c" in cmd:
+            bootstrap = bridge_module._WARM_CONTAINER_BOOTSTRAP
+            local_cmd = [sys.executable, "-u", "-c", bootstrap]
+        else:
+            assert self.ipc_dir is not None
+            entrypoint = cmd[-1].replace("/ipc", str(self.ipc_dir), 1)
+            local_cmd = [sys.executable, "-u", entrypoint]
+        return await super()._spawn_container(local_cmd)
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_executes_code_over_stdin(tmp_path: Path) -> None:
+    sandbox = _LocalSandbox(warm_pool_size=1)
+    try:
+        for _ in range(2):
+            result = await sandbox.execute(
+                "import os\nprint('warm', os.environ.get('EXTRA'))",
+                host_dir=tmp_path,
+                volume_mounts=[f"{tmp_path}:/ipc:rw"],
+                container_env={"EXTRA": "value"},
+            )
+            assert result.success
+            assert result.stdout == "warm value\n"
+        # The entrypoint never touches the per-invocation IPC directory
+        assert not (tmp_path / "entrypoint.py").exists()
+        assert all(f"{tmp_path}:/ipc:rw" not in cmd for cmd in sandbox.spawned)
+        assert all("-c" in cmd for cmd in sandbox.spawned)
+    finally:
+        await sandbox._drain_warm_pool()
+    assert sandbox._warm_pool == {}
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_disabled_by_default(tmp_path: Path) -> None:
+    sandbox = _LocalSandbox()
+    sandbox.ipc_dir = tmp_path
+    assert sandbox.warm_pool_size == 0
+    result = await sandbox.execute(
+        "print('cold')",
+        host_dir=tmp_path,
+        volume_mounts=[f"{tmp_path}:/ipc:rw"],
+    )
+    assert result.success
+    assert (tmp_path / "entrypoint.py").exists()
+    assert sandbox._warm_pool == {}
+
+
+@pytest.mark.asyncio
+async def test_bridge_shutdown_removes_warm_containers(tmp_path: Path) -> None:
+    sandbox = _LocalSandbox(warm_pool_size=2)
+    bridge = MCPBridge(sandbox=sandbox)
+    result = await sandbox.execute(
+        "print('warm')",
+        host_dir=tmp_path,
+        volume_mounts=[f"{tmp_path}:/ipc:rw"],
+    )
+    assert result.success
+    await asyncio.gather(*sandbox._warm_tasks)
+    pooled = [container for pool in sandbox._warm_pool.values() for container in pool]
+    assert pooled
+
+    await bridge.shutdown()
+
+    assert sandbox._warm_pool == {}
+    assert all(container.process.returncode is not None for container in pooled)
+
+
+@pytest.mark.asyncio
+async def test_bridge_shutdown_cancels_runtime_idle_timer() -> None:
+    sandbox = _LocalSandbox()
+    sandbox.runtime_idle_timeout = 300
+    await sandbox._schedule_runtime_shutdown()
+    timer = sandbox._shutdown_task
+    assert timer is not None
+
+    await MCPBridge(sandbox=sandbox).shutdown()
+
+    assert sandbox._shutdown_task is None
+    assert timer.cancelled()